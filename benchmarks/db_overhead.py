@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import text
+
+from src.database import async_session, engine, read_only_session
+from src.utils.db_manager import DBManager
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 3)
+
+
+def summarize(latencies: list[float]) -> dict:
+    return {
+        "iterations": len(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+async def no_query(db: DBManager):
+    pass
+
+
+async def select_one(db: DBManager):
+    await db.session.execute(text("SELECT 1"))
+
+
+async def measure(session_factory, read_only: bool, scenario, iterations: int) -> dict:
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        async with DBManager(session_factory=session_factory, read_only=read_only) as db:
+            await scenario(db)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return summarize(latencies)
+
+
+async def run(args) -> dict:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    modes = {
+        "read_write": (async_session, False),
+        "read_only": (read_only_session, True),
+    }
+    report = {}
+    for scenario in (no_query, select_one):
+        for mode, (session_factory, read_only) in modes.items():
+            await measure(session_factory, read_only, scenario, args.warmup)
+            report[f"{scenario.__name__}:{mode}"] = await measure(
+                session_factory, read_only, scenario, args.iterations
+            )
+    await engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-request DBManager overhead (run with PYTHONPATH=. and DATABASE_URL set)"
+    )
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from benchmarks.load import race, runner, seed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load",
+        description="Seed a local Postgres with synthetic data and drive traffic mixes against the API "
+                    "(run from the repository root with DATABASE_URL and REDIS_URL set; "
+                    "apply migrations with `alembic upgrade head` first)",
+    )
+    parser.add_argument("--manifest", default="benchmark-seed.json")
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed.add_arguments(commands.add_parser("seed", help="Truncate the database and load synthetic data"))
+    runner.add_arguments(commands.add_parser("run", help="Run traffic mixes and report latency percentiles"))
+    race.add_arguments(commands.add_parser(
+        "race", help="Fire parallel bookings at a book with a few free copies and check for double-bookings"
+    ))
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        report = asyncio.run(seed.seed(args))
+    elif args.command == "race":
+        report = asyncio.run(race.race(args))
+    else:
+        report = asyncio.run(runner.run(args))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.command == "race" and not report["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
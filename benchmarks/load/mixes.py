@@ -0,0 +1,133 @@
+import random
+
+import httpx
+
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+
+class Scenario:
+    def __init__(self, manifest: dict, rng: random.Random, bypass_cache: bool):
+        self.manifest = manifest
+        self.rng = rng
+        self.headers = NO_CACHE if bypass_cache else {}
+        self.popular_books = max(1, manifest["books"] // 100)
+
+    def book_id(self) -> int:
+        if self.rng.random() < 0.8:
+            return self.rng.randint(1, self.popular_books)
+        return self.rng.randint(1, self.manifest["books"])
+
+    def catalog_page(self) -> int:
+        return min(int(self.rng.expovariate(0.5)) + 1, 50)
+
+    async def browse_catalog(self, client: httpx.AsyncClient):
+        return await client.get(
+            "/book/catalog", params={"page": self.catalog_page()}, headers=self.headers
+        )
+
+    async def search_catalog(self, client: httpx.AsyncClient):
+        params = {"page": 1}
+        roll = self.rng.random()
+        if roll < 0.5:
+            params["q"] = self.rng.choice(self.manifest["search_terms"])
+        elif roll < 0.7:
+            params["genre"] = self.rng.choice(self.manifest["genres"])
+        elif roll < 0.85:
+            params["author_id"] = self.rng.randint(1, self.manifest["authors"])
+        elif roll < 0.95:
+            params["country"] = self.rng.choice(self.manifest["countries"])
+        else:
+            params["address"] = self.rng.choice(self.manifest["addresses"])
+        return await client.get("/book/catalog", params=params, headers=self.headers)
+
+    async def view_book(self, client: httpx.AsyncClient):
+        return await client.get(f"/book/{self.book_id()}", headers=self.headers)
+
+    async def view_book_page(self, client: httpx.AsyncClient):
+        return await client.get(f"/book/{self.book_id()}/view")
+
+    async def view_profile(self, client: httpx.AsyncClient):
+        return await client.get("/profile", headers=self.headers)
+
+    async def book_and_cancel(self, client: httpx.AsyncClient):
+        book_id = self.rng.randint(1, min(20, self.manifest["books"]))
+        response = await client.post(f"/book/{book_id}/booking")
+        if response.status_code == 200:
+            await client.delete(f"/profile/{response.json()['booking_id']}")
+        return response
+
+    async def resend_code(self, client: httpx.AsyncClient):
+        every = self.manifest["unverified_every"]
+        user_id = self.rng.randint(1, max(1, self.manifest["users"] // every)) * every
+        email = f"bench-user-{user_id}@example.com"
+        return await client.post("/auth/verify-email/resend", json={"email": email})
+
+    async def admin_table(self, client: httpx.AsyncClient):
+        table = self.rng.choice(("book", "instance", "user", "booking"))
+        return await client.get(
+            f"/admin/table/{table}",
+            params={"page": self.catalog_page(), "per_page": 50},
+            headers=self.headers,
+        )
+
+    async def admin_requests(self, client: httpx.AsyncClient):
+        return await client.get(
+            "/admin/requests", params={"page": self.catalog_page()}, headers=self.headers
+        )
+
+    async def admin_stats(self, client: httpx.AsyncClient):
+        return await client.get("/admin/stats/data", headers=self.headers)
+
+
+MIXES = {
+    "browse": {
+        "role": "anonymous",
+        "actions": {"browse_catalog": 5, "view_book": 4, "view_book_page": 1},
+    },
+    "search": {
+        "role": "anonymous",
+        "actions": {"search_catalog": 8, "view_book": 2},
+    },
+    "booking_storm": {
+        "role": "user",
+        "actions": {"book_and_cancel": 8, "view_book": 1, "view_profile": 1},
+    },
+    "admin": {
+        "role": "admin",
+        "actions": {"admin_table": 6, "admin_requests": 3, "admin_stats": 1},
+    },
+    "email": {
+        "role": "anonymous",
+        "actions": {"resend_code": 1},
+    },
+    "mixed": {
+        "role": "user",
+        "actions": {
+            "browse_catalog": 30,
+            "search_catalog": 20,
+            "view_book": 25,
+            "view_profile": 10,
+            "book_and_cancel": 10,
+            "resend_code": 1,
+        },
+    },
+}
+ACTION_LABELS = {
+    "browse_catalog": "GET /book/catalog",
+    "search_catalog": "GET /book/catalog (filtered)",
+    "view_book": "GET /book/{book_id}",
+    "view_book_page": "GET /book/{book_id}/view",
+    "view_profile": "GET /profile",
+    "book_and_cancel": "POST /book/{book_id}/booking",
+    "resend_code": "POST /auth/verify-email/resend",
+    "admin_table": "GET /admin/table/{table_name}",
+    "admin_requests": "GET /admin/requests",
+    "admin_stats": "GET /admin/stats/data",
+}
+EXPECTED_STATUSES = {
+    "POST /book/{book_id}/booking": {200, 409},
+}
+
+
+def pick_action(scenario: Scenario, mix: dict) -> str:
+    return scenario.rng.choices(list(mix["actions"]), list(mix["actions"].values()))[0]
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import asyncpg
+import httpx
+
+from benchmarks.load.runner import account_email, login, percentile, start_server
+from benchmarks.load.smtp import SmtpSink
+from src.config import settings
+
+DOUBLE_BOOKINGS_SQL = """
+SELECT instance_id, count(*) AS bookings
+FROM booking
+WHERE book_id = $1
+GROUP BY instance_id
+HAVING count(*) > 1
+"""
+
+
+async def create_book(conn, copies: int) -> int:
+    async with conn.transaction():
+        author_id = await conn.fetchval("INSERT INTO author (fullname) VALUES ('Booking race') RETURNING id")
+        book_id = await conn.fetchval(
+            "INSERT INTO book (author_id, title) VALUES ($1, $2) RETURNING id",
+            author_id,
+            f"Booking race {time.time_ns()}",
+        )
+        owner_id = await conn.fetchval("SELECT min(id) FROM \"user\"")
+        point_id = await conn.fetchval("SELECT min(id) FROM exchange_point")
+        await conn.executemany(
+            "INSERT INTO instance (book_id, owner_id, exchange_point_id, status, created_at) "
+            "VALUES ($1, $2, $3, 'FREE', $4)",
+            [(book_id, owner_id, point_id, datetime.now(timezone.utc))] * copies,
+        )
+    return book_id
+
+
+async def drop_book(conn, book_id: int) -> None:
+    async with conn.transaction():
+        author_id = await conn.fetchval("SELECT author_id FROM book WHERE id = $1", book_id)
+        await conn.execute("DELETE FROM booking WHERE book_id = $1", book_id)
+        await conn.execute("DELETE FROM instance WHERE book_id = $1", book_id)
+        await conn.execute("DELETE FROM book WHERE id = $1", book_id)
+        await conn.execute("DELETE FROM author WHERE id = $1", author_id)
+
+
+async def check_book(conn, book_id: int, copies: int, statuses: Counter) -> list[str]:
+    failures = []
+    if statuses[200] != copies:
+        failures.append(f"expected {copies} successful bookings, got {statuses[200]}")
+    unexpected = {status: count for status, count in statuses.items() if status not in (200, 409)}
+    if unexpected:
+        failures.append(f"unexpected statuses: {unexpected}")
+    bookings = await conn.fetchval("SELECT count(*) FROM booking WHERE book_id = $1", book_id)
+    booked = await conn.fetchval(
+        "SELECT count(*) FROM instance WHERE book_id = $1 AND status = 'BOOKED'", book_id
+    )
+    if bookings != statuses[200] or booked != statuses[200]:
+        failures.append(f"{bookings} booking rows and {booked} booked instances for {statuses[200]} successes")
+    return failures
+
+
+async def book(client: httpx.AsyncClient, book_id: int, start: asyncio.Event) -> tuple[int, float]:
+    await start.wait()
+    started = time.perf_counter()
+    try:
+        response = await client.post(f"/book/{book_id}/booking")
+    except httpx.HTTPError:
+        return 0, (time.perf_counter() - started) * 1000
+    return response.status_code, response.elapsed.total_seconds() * 1000
+
+
+async def run_round(conn, clients: list[httpx.AsyncClient], copies: int) -> dict:
+    book_id = await create_book(conn, copies)
+    try:
+        start = asyncio.Event()
+        tasks = [asyncio.create_task(book(client, book_id, start)) for client in clients]
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        start.set()
+        results = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        statuses = Counter(status for status, _ in results)
+        latencies = [latency for _, latency in results]
+        double_bookings = [dict(row) for row in await conn.fetch(DOUBLE_BOOKINGS_SQL, book_id)]
+        failures = await check_book(conn, book_id, copies, statuses)
+        failures += [
+            f"instance {row['instance_id']} has {row['bookings']} bookings" for row in double_bookings
+        ]
+        return {
+            "book_id": book_id,
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            "seconds": round(elapsed, 3),
+            "requests_per_second": round(len(results) / elapsed, 2),
+            "bookings_per_second": round(statuses[200] / elapsed, 2),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "double_bookings": len(double_bookings),
+            "failures": failures,
+        }
+    finally:
+        await drop_book(conn, book_id)
+
+
+async def race(args) -> dict:
+    with open(args.manifest, encoding="utf-8") as file:
+        manifest = json.load(file)
+    sink = SmtpSink()
+    await sink.start()
+    process = None
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    clients = []
+    try:
+        base_url = args.base_url
+        if base_url is None:
+            process, base_url = await start_server(sink, args)
+        clients = [httpx.AsyncClient(base_url=base_url, timeout=args.timeout) for _ in range(args.requests)]
+        await asyncio.gather(*(
+            login(client, account_email(manifest, "user", index), manifest["password"])
+            for index, client in enumerate(clients)
+        ))
+        rounds = [await run_round(conn, clients, args.copies) for _ in range(args.rounds)]
+        total_seconds = sum(item["seconds"] for item in rounds)
+        successes = sum(item["statuses"].get("200", 0) for item in rounds)
+        return {
+            "copies": args.copies,
+            "requests": args.requests,
+            "rounds": rounds,
+            "requests_per_second": round(args.requests * len(rounds) / total_seconds, 2),
+            "bookings_per_second": round(successes / total_seconds, 2),
+            "double_bookings": sum(item["double_bookings"] for item in rounds),
+            "ok": not any(item["failures"] for item in rounds),
+        }
+    finally:
+        await asyncio.gather(*(client.aclose() for client in clients))
+        await conn.close()
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        await sink.stop()
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--copies", type=int, default=5, help="Free instances of the contested book")
+    parser.add_argument("--requests", type=int, default=200, help="Parallel booking requests, one user each")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--base-url",
+        help="Target an already running server (start it with RATE_LIMIT_ENABLED=false)",
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0)
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from benchmarks.load.mixes import ACTION_LABELS, EXPECTED_STATUSES, MIXES, Scenario, pick_action
+from benchmarks.load.smtp import SmtpSink
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+
+    def summary(self, elapsed: float) -> dict:
+        return {
+            "requests": len(self.latencies) + self.errors,
+            "errors": self.errors,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "rps": round(len(self.latencies) / elapsed, 2) if elapsed else None,
+            "p50_ms": percentile(self.latencies, 50),
+            "p95_ms": percentile(self.latencies, 95),
+            "p99_ms": percentile(self.latencies, 99),
+        }
+
+
+def account_email(manifest: dict, role: str, worker: int) -> str | None:
+    if role == "admin":
+        return manifest["admin_email"]
+    if role == "user":
+        user_id = worker + 1 + worker // (manifest["unverified_every"] - 1)
+        return f"bench-user-{user_id}@example.com"
+    return None
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> None:
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+
+
+async def worker(client, scenario, mix, deadline, stats, warmup_until):
+    while time.perf_counter() < deadline:
+        action = pick_action(scenario, mix)
+        label = ACTION_LABELS[action]
+        started = time.perf_counter()
+        try:
+            response = await getattr(scenario, action)(client)
+        except httpx.HTTPError:
+            if started >= warmup_until:
+                stats[label].errors += 1
+            continue
+        if started < warmup_until:
+            continue
+        endpoint = stats[label]
+        endpoint.statuses[response.status_code] += 1
+        if response.status_code in EXPECTED_STATUSES.get(label, (200,)):
+            endpoint.latencies.append(response.elapsed.total_seconds() * 1000)
+        else:
+            endpoint.errors += 1
+
+
+def server_env(sink: SmtpSink) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "RATE_LIMIT_ENABLED": "false",
+        "SMTP_HOST": sink.host,
+        "SMTP_PORT": str(sink.port),
+        "SMTP_STARTTLS": "false",
+        "SMTP_SSL": "false",
+        "SMTP_USER": "",
+        "SMTP_PASS": "",
+        "SMTP_FROM": "bench@example.com",
+        "EMAIL_OUTBOX_POLL_SECONDS": "0.5",
+    })
+    return env
+
+
+async def start_server(sink: SmtpSink, args):
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "src.main:app",
+            "--host", "127.0.0.1", "--port", str(args.port), "--no-access-log",
+        ],
+        env=server_env(sink),
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(300):
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                await client.get("/auth/login")
+                return process, base_url
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Server did not become ready")
+
+
+async def run_mix(base_url: str, manifest: dict, mix_name: str, args) -> dict:
+    mix = MIXES[mix_name]
+    stats = defaultdict(EndpointStats)
+    clients = [
+        httpx.AsyncClient(base_url=base_url, timeout=args.timeout)
+        for _ in range(args.concurrency)
+    ]
+    try:
+        emails = [account_email(manifest, mix["role"], index) for index in range(args.concurrency)]
+        await asyncio.gather(*(
+            login(client, email, manifest["password"])
+            for client, email in zip(clients, emails)
+            if email is not None
+        ))
+        started = time.perf_counter()
+        warmup_until = started + args.warmup
+        deadline = warmup_until + args.duration
+        await asyncio.gather(*(
+            worker(
+                client,
+                Scenario(manifest, random.Random(args.seed + index), args.bypass_cache),
+                mix,
+                deadline,
+                stats,
+                warmup_until,
+            )
+            for index, client in enumerate(clients)
+        ))
+    finally:
+        await asyncio.gather(*(client.aclose() for client in clients))
+
+    endpoints = {label: endpoint.summary(args.duration) for label, endpoint in sorted(stats.items())}
+    completed = sum(len(endpoint.latencies) for endpoint in stats.values())
+    return {
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "throughput_rps": round(completed / args.duration, 2),
+        "endpoints": endpoints,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    with open(args.manifest, encoding="utf-8") as file:
+        manifest = json.load(file)
+    sink = SmtpSink()
+    await sink.start()
+    process = None
+    try:
+        base_url = args.base_url
+        if base_url is None:
+            process, base_url = await start_server(sink, args)
+        report = {
+            "revision": git_revision(),
+            "base_url": base_url,
+            "seed": manifest["seed"],
+            "dataset": manifest["counts"],
+            "mixes": {},
+        }
+        for mix_name in args.mix:
+            report["mixes"][mix_name] = await run_mix(base_url, manifest, mix_name, args)
+        if process is not None:
+            await asyncio.sleep(args.drain)
+        report["smtp"] = {"messages": sink.messages, "recipients": sink.recipients}
+        return report
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        await sink.stop()
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--mix", nargs="+", choices=sorted(MIXES), default=["mixed"])
+    parser.add_argument(
+        "--base-url",
+        help="Target an already running server (start it with RATE_LIMIT_ENABLED=false); "
+             "by default a uvicorn process is spawned with SMTP pointed at the in-process sink",
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--drain", type=float, default=2.0, help="Seconds to let the email outbox flush")
+    parser.add_argument("--bypass-cache", action="store_true", help="Send Cache-Control: no-cache")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this file as well")
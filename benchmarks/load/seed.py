@@ -0,0 +1,250 @@
+import bisect
+import itertools
+import json
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import asyncpg
+
+from src.config import settings
+from src.services.user import hash_password_sync
+
+TABLES = (
+    "email_outbox",
+    "booking",
+    "new_added_instance",
+    "instance",
+    "exchange_point",
+    "organisation",
+    "book",
+    "author",
+    '"user"',
+)
+GENRES = (
+    "Роман", "Фантастика", "Детектив", "Фэнтези", "Поэзия", "История",
+    "Биография", "Психология", "Наука", "Детская литература", "Приключения", "Драма",
+)
+COUNTRIES = ("Россия", "США", "Великобритания", "Франция", "Германия", "Япония", "Италия", "Испания")
+TITLE_WORDS = (
+    "тень", "ветер", "город", "море", "ночь", "дорога", "сад", "время", "песня", "остров",
+    "звезда", "память", "дом", "река", "зеркало", "сон", "огонь", "лес", "письмо", "свет",
+    "мастер", "путь", "зима", "гора", "тайна", "книга", "голос", "мост", "небо", "поле",
+)
+FIRST_NAMES = ("Анна", "Иван", "Мария", "Сергей", "Елена", "Алексей", "Ольга", "Дмитрий", "Наталья", "Павел")
+LAST_NAMES = ("Иванов", "Петров", "Смирнов", "Кузнецов", "Попов", "Соколов", "Лебедев", "Козлов", "Новиков", "Морозов")
+STREETS = ("Ленина", "Мира", "Гагарина", "Пушкина", "Советская", "Садовая", "Лесная", "Школьная")
+BENCH_PASSWORD = "bench-password"
+ADMIN_EMAIL = "bench-admin@example.com"
+UNVERIFIED_EVERY = 10
+
+
+def user_email(user_id: int) -> str:
+    return f"bench-user-{user_id}@example.com"
+
+
+class ZipfSampler:
+    def __init__(self, rng: random.Random, size: int, exponent: float):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, size + 1)))
+
+    def sample(self) -> int:
+        return bisect.bisect_left(self.cumulative, self.rng.random() * self.cumulative[-1]) + 1
+
+
+class SyntheticData:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = datetime.now(timezone.utc)
+        self.addresses = [
+            f"ул. {self.rng.choice(STREETS)}, {number}" for number in range(1, args.exchange_points + 1)
+        ]
+
+    def title(self) -> str:
+        words = self.rng.sample(TITLE_WORDS, self.rng.randint(1, 3))
+        return " ".join(words).capitalize()
+
+    def users(self, password_hash: str):
+        for user_id in range(1, self.args.users + 1):
+            yield (
+                user_id,
+                self.rng.choice(FIRST_NAMES),
+                self.rng.choice(LAST_NAMES),
+                user_email(user_id),
+                password_hash,
+                "USER",
+                user_id % UNVERIFIED_EVERY != 0,
+            )
+        yield (self.args.users + 1, "Bench", "Admin", ADMIN_EMAIL, password_hash, "ADMIN", True)
+
+    def authors(self):
+        for author_id in range(1, self.args.authors + 1):
+            yield (
+                author_id,
+                f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)} {author_id}",
+                date(1800, 1, 1) + timedelta(days=self.rng.randint(0, 365 * 190)),
+                self.rng.choice(COUNTRIES),
+            )
+
+    def books(self):
+        for book_id in range(1, self.args.books + 1):
+            yield (
+                book_id,
+                self.rng.randint(1, self.args.authors),
+                self.title(),
+                self.rng.choice(GENRES),
+                self.rng.randint(1850, 2025),
+                f"978{self.rng.randint(10 ** 9, 10 ** 10 - 1)}",
+                None,
+            )
+
+    def organisations(self):
+        for organisation_id in range(1, self.args.organisations + 1):
+            yield organisation_id, f"Библиотека №{organisation_id}", None
+
+    def exchange_points(self):
+        for point_id, address in enumerate(self.addresses, start=1):
+            yield (
+                point_id,
+                self.rng.randint(1, self.args.organisations),
+                address,
+                None,
+                self.rng.uniform(55.55, 55.95),
+                self.rng.uniform(37.35, 37.85),
+            )
+
+    def instances_and_bookings(self):
+        popularity = ZipfSampler(self.rng, self.args.books, self.args.skew)
+        instances, bookings = [], []
+        for instance_id in range(1, self.args.instances + 1):
+            book_id = popularity.sample()
+            owner_id = self.rng.randint(1, self.args.users)
+            roll = self.rng.random()
+            user_id = None
+            if roll < self.args.booked_share:
+                status = "BOOKED"
+                bookings.append((
+                    len(bookings) + 1,
+                    self.rng.randint(1, self.args.users),
+                    instance_id,
+                    book_id,
+                    self.now + timedelta(hours=self.rng.randint(1, settings.BOOKING_HOLD_HOURS)),
+                ))
+            elif roll < self.args.booked_share + self.args.owned_share:
+                status = "OWNED"
+                user_id = self.rng.randint(1, self.args.users)
+            else:
+                status = "FREE"
+            instances.append((
+                instance_id,
+                book_id,
+                user_id,
+                owner_id,
+                self.rng.randint(1, self.args.exchange_points),
+                status,
+                self.now - timedelta(minutes=self.rng.randint(0, 60 * 24 * 365)),
+            ))
+        return instances, bookings
+
+    def new_added_instances(self):
+        for request_id in range(1, self.args.pending_requests + 1):
+            yield (
+                request_id,
+                self.rng.randint(1, self.args.users),
+                self.title(),
+                f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                self.rng.choice(self.addresses),
+                self.now - timedelta(minutes=self.rng.randint(0, 60 * 24 * 30)),
+            )
+
+
+async def copy(conn, table: str, columns: tuple, records) -> int:
+    records = list(records)
+    await conn.copy_records_to_table(table.strip('"'), columns=columns, records=records)
+    await conn.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 1) FROM {table}))"
+    )
+    return len(records)
+
+
+async def seed(args) -> dict:
+    data = SyntheticData(args)
+    password_hash = hash_password_sync(BENCH_PASSWORD)
+    started = time.perf_counter()
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        async with conn.transaction():
+            await conn.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+            instances, bookings = data.instances_and_bookings()
+            counts = {
+                "user": await copy(
+                    conn, '"user"',
+                    ("id", "name", "lastname", "email", "hashed_password", "role", "email_verified"),
+                    data.users(password_hash),
+                ),
+                "author": await copy(conn, "author", ("id", "fullname", "birthday", "country"), data.authors()),
+                "book": await copy(
+                    conn, "book",
+                    ("id", "author_id", "title", "genre", "year", "isbn", "description"),
+                    data.books(),
+                ),
+                "organisation": await copy(
+                    conn, "organisation", ("id", "name", "description"), data.organisations()
+                ),
+                "exchange_point": await copy(
+                    conn, "exchange_point",
+                    ("id", "organisation_id", "address", "description", "latitude", "longitude"),
+                    data.exchange_points(),
+                ),
+                "instance": await copy(
+                    conn, "instance",
+                    ("id", "book_id", "user_id", "owner_id", "exchange_point_id", "status", "created_at"),
+                    instances,
+                ),
+                "booking": await copy(
+                    conn, "booking", ("id", "user_id", "instance_id", "book_id", "expires_at"), bookings
+                ),
+                "new_added_instance": await copy(
+                    conn, "new_added_instance",
+                    ("id", "owner_id", "title", "author", "address", "created_at"),
+                    data.new_added_instances(),
+                ),
+            }
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+
+    manifest = {
+        "seed": args.seed,
+        "skew": args.skew,
+        "counts": counts,
+        "password": BENCH_PASSWORD,
+        "admin_email": ADMIN_EMAIL,
+        "unverified_every": UNVERIFIED_EVERY,
+        "users": args.users,
+        "books": args.books,
+        "authors": args.authors,
+        "genres": list(GENRES),
+        "countries": list(COUNTRIES),
+        "addresses": data.addresses,
+        "search_terms": list(TITLE_WORDS),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    with open(args.manifest, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--instances", type=int, default=500_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--authors", type=int, default=20_000)
+    parser.add_argument("--organisations", type=int, default=50)
+    parser.add_argument("--exchange-points", type=int, default=400)
+    parser.add_argument("--pending-requests", type=int, default=2_000)
+    parser.add_argument("--booked-share", type=float, default=0.1)
+    parser.add_argument("--owned-share", type=float, default=0.2)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of book popularity")
+    parser.add_argument("--seed", type=int, default=42)
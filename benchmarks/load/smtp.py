@@ -0,0 +1,53 @@
+import asyncio
+
+
+class SmtpSink:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.server = None
+        self.messages = 0
+        self.recipients = 0
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        try:
+            await reply("220 bench-smtp ready")
+            while line := await reader.readline():
+                command = line.decode(errors="replace").strip().upper()
+                if command.startswith("EHLO"):
+                    await reply("250-bench-smtp")
+                    await reply("250 8BITMIME")
+                elif command.startswith(("HELO", "MAIL", "RSET", "NOOP")):
+                    await reply("250 OK")
+                elif command.startswith("RCPT"):
+                    self.recipients += 1
+                    await reply("250 OK")
+                elif command == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    while (data := await reader.readline()).rstrip(b"\r\n") != b".":
+                        if not data:
+                            return
+                    self.messages += 1
+                    await reply("250 OK")
+                elif command == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
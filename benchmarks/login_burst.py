@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+async def ensure_user(client: httpx.AsyncClient, email: str, password: str):
+    await client.post(
+        "/auth/register",
+        json={"name": "Bench", "lastname": "User", "email": email, "password": password},
+    )
+
+
+async def login_worker(client, email, password, remaining, latencies, errors):
+    while remaining[0] > 0:
+        remaining[0] -= 1
+        started = time.perf_counter()
+        response = await client.post("/auth/login", json={"email": email, "password": password})
+        if response.status_code == 200:
+            latencies.append((time.perf_counter() - started) * 1000)
+        else:
+            errors[0] += 1
+
+
+async def catalog_worker(client, stop, latencies, errors):
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/book/catalog", headers={"Cache-Control": "no-cache"})
+        if response.status_code == 200:
+            latencies.append((time.perf_counter() - started) * 1000)
+        else:
+            errors[0] += 1
+
+
+async def run(args) -> dict:
+    limits = httpx.Limits(max_connections=args.login_concurrency + args.catalog_concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        email = args.email or f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        if not args.email:
+            await ensure_user(client, email, args.password)
+
+        login_latencies, login_errors = [], [0]
+        catalog_latencies, catalog_errors = [], [0]
+        remaining = [args.logins]
+        stop = asyncio.Event()
+
+        catalog_tasks = [
+            asyncio.create_task(catalog_worker(client, stop, catalog_latencies, catalog_errors))
+            for _ in range(args.catalog_concurrency)
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                login_worker(client, email, args.password, remaining, login_latencies, login_errors)
+                for _ in range(args.login_concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*catalog_tasks)
+
+    return {
+        "login": summarize(login_latencies, login_errors[0], elapsed),
+        "catalog_during_burst": summarize(catalog_latencies, catalog_errors[0], elapsed),
+        "elapsed_s": round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Login burst benchmark (run the server with RATE_LIMIT_ENABLED=false)"
+    )
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    parser.add_argument("--catalog-concurrency", type=int, default=4)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,4 +4,4 @@ set -e
 # Apply migrations before starting the app.
 alembic upgrade head
 
-exec uvicorn src.main:app --host 0.0.0.0 --port 8000
+exec python -m src.server
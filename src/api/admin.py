@@ -1,13 +1,17 @@
-import uuid
+import hmac
 from datetime import datetime, timezone, date
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+from fastapi import APIRouter, BackgroundTasks, HTTPException, UploadFile, File, Form, Request
 from sqlalchemy import select, update, delete, func, or_
-from starlette.responses import HTMLResponse, FileResponse
-from fastapi_cache.decorator import cache
+from starlette.responses import HTMLResponse, PlainTextResponse
 
+from src.config import settings
+from src.database import pool_metrics, replica_router
 from src.dependencies.db_dep import DBDep
+from src.dependencies.user_dep import get_auth
+from src.api.images import ImageUploadRoute
+from src.init import redis_manager
 from src.models.author import AuthorORM
 from src.models.book import BookORM
 from src.models.booking import BookingORM
@@ -19,15 +23,22 @@ from src.models.user import UserORM
 from src.schemas.author import AuthorAdd
 from src.schemas.book import BookAdd
 from src.schemas.instance import InstanceAdd
-from src.services.user import AuthService
+from src.services.images import ImageStorageService
+from src.services.shelves import shelf_index
+from src.services.suggestions import book_suggest_index
+from src.services.thumbnails import ThumbnailService
+from src.services.user import AuthService, UserCacheService
+from src.utils.cache import cache
+from src.utils.metrics import metrics_registry
+from src.utils.pages import page_response
 
 router = APIRouter(prefix="/admin", tags=["Админ"])
+upload_router = APIRouter(route_class=ImageUploadRoute)
 ADMIN_TEMPLATE_PATH = Path(__file__).resolve().parents[1] / "templates" / "admin.html"
 ADMIN_REQUEST_TEMPLATE_PATH = Path(__file__).resolve().parents[1] / "templates" / "admin_request.html"
 ADMIN_REQUESTS_TEMPLATE_PATH = Path(__file__).resolve().parents[1] / "templates" / "admin_requests.html"
 ADMIN_RECORDS_TEMPLATE_PATH = Path(__file__).resolve().parents[1] / "templates" / "admin_records.html"
 ADMIN_STATS_TEMPLATE_PATH = Path(__file__).resolve().parents[1] / "templates" / "admin_stats.html"
-IMAGES_DIR = Path(__file__).resolve().parents[1] / "imgs"
 
 MODEL_MAP = {
     "user": UserORM,
@@ -39,6 +50,17 @@ MODEL_MAP = {
     "booking": BookingORM,
     "new_added_instance": NewAddedInstanceORM,
 }
+SHELF_TABLES = {"exchange_point", "organisation"}
+SUGGEST_TABLES = {"book", "author"}
+
+
+async def invalidate_table_caches(table_name: str, row_id: int) -> None:
+    if table_name == "user":
+        await UserCacheService().invalidate(row_id)
+    if table_name in SHELF_TABLES:
+        await shelf_index.invalidate()
+    if table_name in SUGGEST_TABLES:
+        await book_suggest_index.publish((table_name, row_id))
 
 
 def ensure_admin(payload: dict):
@@ -47,12 +69,8 @@ def ensure_admin(payload: dict):
 
 
 def get_admin_payload_or_404(request: Request):
-    token = request.cookies.get("access_token")
-    if not token:
-        raise HTTPException(status_code=404, detail="Not found")
-    try:
-        payload = AuthService().decode_token(token)
-    except Exception:
+    payload = get_auth(request).payload
+    if payload is None:
         raise HTTPException(status_code=404, detail="Not found")
     ensure_admin(payload)
     return payload
@@ -153,37 +171,37 @@ def build_table_filters(model, query: str | None):
 @router.get("/view", response_class=HTMLResponse, summary="HTML админка")
 async def admin_view_page(request: Request):
     get_admin_payload_or_404(request)
-    return FileResponse(ADMIN_TEMPLATE_PATH)
+    return page_response(ADMIN_TEMPLATE_PATH)
 
 
 @router.get("", response_class=HTMLResponse, summary="HTML админка")
 async def admin_root_page(request: Request):
     get_admin_payload_or_404(request)
-    return FileResponse(ADMIN_TEMPLATE_PATH)
+    return page_response(ADMIN_TEMPLATE_PATH)
 
 
 @router.get("/requests/{request_id}/view", response_class=HTMLResponse, summary="HTML страница заявки")
 async def admin_request_view_page(request_id: int, request: Request):
     get_admin_payload_or_404(request)
-    return FileResponse(ADMIN_REQUEST_TEMPLATE_PATH)
+    return page_response(ADMIN_REQUEST_TEMPLATE_PATH)
 
 
 @router.get("/requests/view", response_class=HTMLResponse, summary="HTML список заявок")
 async def admin_requests_view_page(request: Request):
     get_admin_payload_or_404(request)
-    return FileResponse(ADMIN_REQUESTS_TEMPLATE_PATH)
+    return page_response(ADMIN_REQUESTS_TEMPLATE_PATH)
 
 
 @router.get("/records/view", response_class=HTMLResponse, summary="HTML редактор записей")
 async def admin_records_view_page(request: Request):
     get_admin_payload_or_404(request)
-    return FileResponse(ADMIN_RECORDS_TEMPLATE_PATH)
+    return page_response(ADMIN_RECORDS_TEMPLATE_PATH)
 
 
 @router.get("/stats", response_class=HTMLResponse, summary="HTML статистика")
 async def admin_stats_view_page(request: Request):
     get_admin_payload_or_404(request)
-    return FileResponse(ADMIN_STATS_TEMPLATE_PATH)
+    return page_response(ADMIN_STATS_TEMPLATE_PATH)
 
 
 @router.get("/stats/data", summary="Данные статистики")
@@ -211,6 +229,25 @@ async def admin_stats_data(db: DBDep, request: Request):
     }
 
 
+@router.get("/health", summary="Состояние подключений")
+async def admin_health(request: Request):
+    get_admin_payload_or_404(request)
+    return {
+        "redis": await redis_manager.health(),
+        "database_pool": pool_metrics.snapshot(),
+        "database_replicas": replica_router.health(),
+    }
+
+
+@router.get("/metrics", summary="Метрики в формате Prometheus", response_class=PlainTextResponse)
+async def admin_metrics(request: Request):
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get("authorization", "")
+    if not token or not hmac.compare_digest(authorization, f"Bearer {token}"):
+        get_admin_payload_or_404(request)
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @router.get("/meta", summary="Метаданные админки")
 @cache(expire=20)
 async def admin_meta(db: DBDep, request: Request):
@@ -293,11 +330,12 @@ async def admin_delete_request(request_id: int, db: DBDep, request: Request):
     return {"status": "ok"}
 
 
-@router.post("/requests/{request_id}/approve", summary="Обработать заявку")
+@upload_router.post("/requests/{request_id}/approve", summary="Обработать заявку")
 async def admin_approve_request(
     request_id: int,
     db: DBDep,
     request: Request,
+    background_tasks: BackgroundTasks,
     exchange_point_id: int = Form(...),
     title: str | None = Form(None),
     author_fullname: str | None = Form(None),
@@ -331,13 +369,11 @@ async def admin_approve_request(
         )
 
     image_name = None
+    image_placeholder = None
     if image_file and image_file.filename:
-        suffix = Path(image_file.filename).suffix.lower() or ".jpg"
-        image_name = f"{uuid.uuid4().hex}{suffix}"
-        IMAGES_DIR.mkdir(parents=True, exist_ok=True)
-        file_path = IMAGES_DIR / image_name
-        content = await image_file.read()
-        file_path.write_bytes(content)
+        image_name = await ImageStorageService().save_upload(image_file)
+        image_placeholder = await ThumbnailService().placeholder(image_name)
+        background_tasks.add_task(ThumbnailService().warm_up, image_name)
 
     book = await db.book.get_one_or_none(title=effective_title)
     if not book:
@@ -350,6 +386,7 @@ async def admin_approve_request(
                 isbn=isbn.strip() if isbn else None,
                 description=description.strip() if description else None,
                 image=image_name,
+                image_placeholder=image_placeholder,
             )
         )
     else:
@@ -364,6 +401,7 @@ async def admin_approve_request(
             edit_payload["description"] = description.strip()
         if image_name:
             edit_payload["image"] = image_name
+            edit_payload["image_placeholder"] = image_placeholder
         if edit_payload:
             await db.session.execute(
                 update(BookORM).where(BookORM.id == book.id).values(**edit_payload)
@@ -381,6 +419,7 @@ async def admin_approve_request(
     )
     await db.new_added_instance.delete(request_id)
     await db.commit()
+    await book_suggest_index.publish(("book", book.id), ("author", author.id))
     return {"status": "ok"}
 
 
@@ -430,7 +469,7 @@ async def admin_table_create(table_name: str, db: DBDep, request: Request, data:
     if table_name == "user":
         raw_password = str(payload_data.get("password") or "").strip()
         if raw_password:
-            payload_data["hashed_password"] = AuthService().hash_password(raw_password)
+            payload_data["hashed_password"] = await AuthService().hash_password(raw_password)
         payload_data.pop("password", None)
     values = normalize_payload(model, payload_data)
     if not values:
@@ -440,6 +479,7 @@ async def admin_table_create(table_name: str, db: DBDep, request: Request, data:
     created_result = await db.session.execute(select(model).where(model.id == created_id))
     created = created_result.scalars().one_or_none()
     await db.commit()
+    await invalidate_table_caches(table_name, created_id)
     if created is None:
         return {"item": {"id": int(created_id), **values}}
     return {"item": model_to_dict(created)}
@@ -456,6 +496,7 @@ async def admin_table_update(table_name: str, row_id: int, db: DBDep, request: R
         raise HTTPException(status_code=400, detail="Нет данных для обновления")
     await db.session.execute(update(model).where(model.id == row_id).values(**values))
     await db.commit()
+    await invalidate_table_caches(table_name, row_id)
     return {"status": "ok"}
 
 
@@ -467,11 +508,18 @@ async def admin_table_delete(table_name: str, row_id: int, db: DBDep, request: R
         raise HTTPException(status_code=404, detail="Таблица не найдена")
     await db.session.execute(delete(model).where(model.id == row_id))
     await db.commit()
+    await invalidate_table_caches(table_name, row_id)
     return {"status": "ok"}
 
 
-@router.post("/table/book/{row_id}/image", summary="Загрузить картинку для книги")
-async def admin_book_upload_image(row_id: int, db: DBDep, request: Request, image_file: UploadFile = File(...)):
+@upload_router.post("/table/book/{row_id}/image", summary="Загрузить картинку для книги")
+async def admin_book_upload_image(
+    row_id: int,
+    db: DBDep,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    image_file: UploadFile = File(...),
+):
     get_admin_payload_or_404(request)
     book = await db.book.get_one_or_none(id=row_id)
     if not book:
@@ -479,12 +527,17 @@ async def admin_book_upload_image(row_id: int, db: DBDep, request: Request, imag
     if not image_file.filename:
         raise HTTPException(status_code=400, detail="Файл не выбран")
 
-    suffix = Path(image_file.filename).suffix.lower() or ".jpg"
-    image_name = f"{uuid.uuid4().hex}{suffix}"
-    IMAGES_DIR.mkdir(parents=True, exist_ok=True)
-    file_path = IMAGES_DIR / image_name
-    file_path.write_bytes(await image_file.read())
+    image_name = await ImageStorageService().save_upload(image_file)
+    image_placeholder = await ThumbnailService().placeholder(image_name)
+    background_tasks.add_task(ThumbnailService().warm_up, image_name)
 
-    await db.session.execute(update(BookORM).where(BookORM.id == row_id).values(image=image_name))
+    await db.session.execute(
+        update(BookORM)
+        .where(BookORM.id == row_id)
+        .values(image=image_name, image_placeholder=image_placeholder)
+    )
     await db.commit()
     return {"status": "ok", "image": image_name}
+
+
+router.include_router(upload_router)
@@ -2,8 +2,7 @@ from pathlib import Path
 import random
 
 from fastapi import APIRouter, HTTPException, Response
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
-from fastapi_cache.decorator import cache
+from fastapi.responses import HTMLResponse, JSONResponse
 from sqlalchemy import update
 
 from src.dependencies.db_dep import DBDep
@@ -15,8 +14,9 @@ from src.schemas.user import (
     UserLogin,
     VerifyEmailCodeRequest,
 )
-from src.services.email import EmailService
-from src.services.user import AuthService
+from src.services.user import AuthService, UserCacheService
+from src.utils.cache import cache
+from src.utils.pages import page_response
 
 router = APIRouter(prefix="/auth", tags=["Авторизация"])
 REGISTER_TEMPLATE_PATH = Path(__file__).resolve().parents[1] / "templates" / "register.html"
@@ -41,8 +41,10 @@ def build_verification_email_body(code: str) -> str:
 
 
 async def set_email_verification_code(db: DBDep, user_id: int, user_email: str) -> None:
+    from src.services.email import EmailOutboxService
+
     code = f"{random.randint(0, 9999):04d}"
-    hashed_code = AuthService().hash_password(code)
+    hashed_code = await AuthService().hash_password(code)
     await db.session.execute(
         update(UserORM)
         .where(UserORM.id == user_id)
@@ -51,37 +53,32 @@ async def set_email_verification_code(db: DBDep, user_id: int, user_email: str)
             email_verification_code=hashed_code,
         )
     )
-    try:
-        EmailService().send_email(
-            to_email=user_email,
-            subject="Код подтверждения Bookcrossing",
-            body=build_verification_email_body(code),
-        )
-    except Exception as exc:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Не удалось отправить код на почту: {exc}",
-        )
+    await EmailOutboxService().enqueue(
+        db,
+        to_email=user_email,
+        subject="Код подтверждения Bookcrossing",
+        body=build_verification_email_body(code),
+    )
 
 
 @router.get("/register", response_class=HTMLResponse, summary="Страница регистрации")
 async def register_page():
-    return FileResponse(REGISTER_TEMPLATE_PATH)
+    return page_response(REGISTER_TEMPLATE_PATH)
 
 
 @router.get("/login", response_class=HTMLResponse, summary="Страница входа")
 async def login_page():
-    return FileResponse(LOGIN_TEMPLATE_PATH)
+    return page_response(LOGIN_TEMPLATE_PATH)
 
 
 @router.get("/verify-email/view", response_class=HTMLResponse, summary="Страница подтверждения email")
 async def verify_email_page():
-    return FileResponse(VERIFY_EMAIL_TEMPLATE_PATH)
+    return page_response(VERIFY_EMAIL_TEMPLATE_PATH)
 
 
 @router.post("/register", summary="Регистрация")
 async def register(db: DBDep, user_data: UserAddRequest, response: Response):
-    hashed_password = AuthService().hash_password(user_data.password)
+    hashed_password = await AuthService().hash_password(user_data.password)
     add_payload = UserAdd(**user_data.model_dump(), hashed_password=hashed_password)
     try:
         user = await db.user.add(add_payload)
@@ -100,13 +97,14 @@ async def login(db: DBDep, user_data: UserLogin, response: Response):
     user = await db.user.get_user_with_hashed_password(email=user_data.email)
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
-    if not AuthService().verify_password(user_data.password, user.hashed_password):
+    if not await AuthService().verify_password(user_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Пароль не верный")
 
     # ВРЕМЕННО отключено подтверждение email:
     # if not user.email_verified:
     #     await set_email_verification_code(db, user.id, str(user.email))
     #     await db.commit()
+    #     await UserCacheService().invalidate(user.id)
     #     return JSONResponse(
     #         status_code=403,
     #         content={
@@ -132,7 +130,7 @@ async def verify_email(db: DBDep, payload: VerifyEmailCodeRequest, response: Res
     normalized_code = normalize_4digit_code(payload.code)
     if not user.email_verification_code:
         raise HTTPException(status_code=400, detail="Код не запрошен")
-    if not AuthService().verify_password(normalized_code, user.email_verification_code):
+    if not await AuthService().verify_password(normalized_code, user.email_verification_code):
         raise HTTPException(status_code=400, detail="Неверный код")
 
     await db.session.execute(
@@ -144,6 +142,7 @@ async def verify_email(db: DBDep, payload: VerifyEmailCodeRequest, response: Res
         )
     )
     await db.commit()
+    await UserCacheService().invalidate(user.id)
 
     verified_user = await db.user.get_one_or_none(id=user.id)
     access_token = AuthService().add_token(verified_user, response)
@@ -160,6 +159,7 @@ async def resend_email_code(db: DBDep, payload: ResendEmailCodeRequest):
 
     await set_email_verification_code(db, user.id, str(user.email))
     await db.commit()
+    await UserCacheService().invalidate(user.id)
     return {"status": "ok", "detail": "Код отправлен повторно"}
 
 
@@ -1,15 +1,20 @@
+import heapq
 from datetime import datetime, timezone
 from pathlib import Path
 
-from fastapi import APIRouter, Request, HTTPException
-from starlette.responses import HTMLResponse, FileResponse
-from fastapi_cache.decorator import cache
+from fastapi import APIRouter, Query, Request, HTTPException
+from starlette.responses import HTMLResponse
 
+from src.config import settings
 from src.dependencies.db_dep import DBDep
-from src.dependencies.user_dep import PayloadDep
-from src.schemas.booking import BookingAdd
-from src.schemas.instance import InstancePatch
-from src.services.user import AuthService
+from src.dependencies.user_dep import PayloadDep, get_auth
+from src.services.booking import BookingService
+from src.services.shelves import shelf_index
+from src.services.suggestions import book_suggest_index
+from src.utils.cache import cache
+from src.utils.pages import page_response
+from src.utils.spatial import haversine_km
+from src.utils.ssr import render_book_page, render_catalog_page
 
 router = APIRouter(prefix="/book", tags=["Книга"])
 BOOK_TEMPLATE_PATH = Path(__file__).resolve().parents[1] / "templates" / "book.html"
@@ -47,13 +52,14 @@ async def enrich_books_with_user_flags(db: DBDep, books: list, user_id: int | No
 
 
 @router.get("/catalog/view", summary="HTML страница каталога", response_class=HTMLResponse)
-async def books_catalog_view_page():
-    return FileResponse(BOOKS_TEMPLATE_PATH)
+async def books_catalog_view_page(db: DBDep, request: Request, address: str | None = None):
+    if not settings.SSR_ENABLED:
+        return page_response(BOOKS_TEMPLATE_PATH)
+    context = await get_catalog_context(db, request, address=address)
+    return render_catalog_page(BOOKS_TEMPLATE_PATH, context)
 
 
-@router.get("/catalog", summary="Каталог книг с фильтрами и пагинацией")
-@cache(expire=20)
-async def books_catalog(
+async def get_catalog_context(
     db: DBDep,
     request: Request,
     page: int = 1,
@@ -83,14 +89,7 @@ async def books_catalog(
         country=country,
         address=address,
     )
-    user_id = None
-    access_token = request.cookies.get("access_token")
-    if access_token:
-        try:
-            payload = AuthService().decode_token(access_token)
-            user_id = payload.get("user_id")
-        except Exception:
-            user_id = None
+    user_id = get_auth(request).user_id
     books_payload = await enrich_books_with_user_flags(db, books, user_id)
     filters = await db.book.get_filter_values()
     total_pages = (total + per_page - 1) // per_page if total > 0 else 0
@@ -105,35 +104,60 @@ async def books_catalog(
     }
 
 
+@router.get("/catalog", summary="Каталог книг с фильтрами и пагинацией")
+@cache(expire=20, namespace="book")
+async def books_catalog(
+    db: DBDep,
+    request: Request,
+    page: int = 1,
+    q: str | None = None,
+    genre: str | None = None,
+    author_id: int | None = None,
+    year: int | None = None,
+    country: str | None = None,
+    address: str | None = None,
+):
+    return await get_catalog_context(
+        db,
+        request,
+        page=page,
+        q=q,
+        genre=genre,
+        author_id=author_id,
+        year=year,
+        country=country,
+        address=address,
+    )
+
+
+@router.get("/suggest", summary="Подсказки по названиям книг и авторам")
+async def books_suggest(q: str = Query(max_length=100), limit: int = Query(10, ge=1, le=20)):
+    index = await book_suggest_index.get()
+    return {"items": index.suggest(q, limit)}
+
+
 @router.get("/{book_id}/view", summary="HTML страница книги", response_class=HTMLResponse)
-async def book_view_page(book_id: int):
-    return FileResponse(BOOK_TEMPLATE_PATH)
+async def book_view_page(book_id: int, db: DBDep, request: Request):
+    if not settings.SSR_ENABLED:
+        return page_response(BOOK_TEMPLATE_PATH)
+    context = await get_book_context(book_id, db, request)
+    return render_book_page(BOOK_TEMPLATE_PATH, context)
 
 
-@router.get("/{book_id}", summary="Получить книгу")
-@cache(expire=20)
-async def get_book(book_id: int, db: DBDep, request: Request):
-    user = None
-    payload = None
-    access_token = request.cookies.get("access_token")
+async def get_book_context(book_id: int, db: DBDep, request: Request):
+    auth = get_auth(request)
+    payload = auth.payload
     instances = await db.instance.get_all(book_id=book_id)
     instances = [instance for instance in instances if
                  instance.status == "FREE"]
-    exchange_point_ids = list({instance.exchange_point_id for instance in instances})
-
-    if access_token:
-        try:
-            payload = AuthService().decode_token(access_token)
-            user = await db.user.get_one_or_none(id=payload["user_id"])
-        except Exception:
-            user = None
+    user = await auth.get_user(db)
 
     if not instances:
         instances = None
         exchanges_point = None
     else:
-        exchanges_point = await db.exchange_point.get_all_by_inctances(
-            exchange_point_ids)
+        snapshot = await shelf_index.get()
+        exchanges_point = snapshot.select(instance.exchange_point_id for instance in instances)
     booking = None
     if payload:
         booking = await db.booking.get_one_or_none(
@@ -160,12 +184,59 @@ async def get_book(book_id: int, db: DBDep, request: Request):
     return context
 
 
+@router.get("/{book_id}", summary="Получить книгу")
+@cache(expire=20, namespace="book")
+async def get_book(book_id: int, db: DBDep, request: Request):
+    return await get_book_context(book_id, db, request)
+
+
+@router.get("/{book_id}/nearest", summary="Ближайшие свободные экземпляры книги")
+async def nearest_book_instances(
+    book_id: int,
+    db: DBDep,
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    limit: int = Query(5, ge=1, le=50),
+):
+    free_instances = await db.instance.get_free_by_exchange_point(book_id)
+    snapshot = await shelf_index.get()
+    shelves = (snapshot.shelves.get(shelf_id) for shelf_id in free_instances)
+    distances = [
+        (haversine_km(lat, lon, shelf["latitude"], shelf["longitude"]), shelf["id"])
+        for shelf in shelves
+        if shelf is not None and shelf["latitude"] is not None and shelf["longitude"] is not None
+    ]
+    return {
+        "items": [
+            {
+                "exchange_point": snapshot.shelves[shelf_id],
+                "distance_km": round(distance, 3),
+                "instance_ids": free_instances[shelf_id],
+            }
+            for distance, shelf_id in heapq.nsmallest(limit, distances)
+        ]
+    }
+
+
+async def book_instance(book_id: int, user_id: int, db: DBDep, instance_id: int | None = None):
+    booking = await db.booking.book_free_instance(
+        user_id=user_id,
+        book_id=book_id,
+        instance_id=instance_id,
+        expires_at=BookingService().hold_expires_at(),
+    )
+    if booking is None:
+        raise HTTPException(status_code=409, detail="Экземпляр уже забронирован")
+    await db.commit()
+    return {"status": "ok", "booking_id": booking["id"], "instance_id": booking["instance_id"]}
+
+
+@router.post("/{book_id}/booking", summary="Забронировать любой свободный экземпляр")
+async def create_any_booking(book_id: int, db: DBDep, payload: PayloadDep):
+    return await book_instance(book_id, payload["user_id"], db)
+
+
 @router.post("/{book_id}/booking/{instance_id}", summary="Забронировать книгу")
 async def create_booking(book_id: int, instance_id: int, db: DBDep,
                          payload: PayloadDep):
-    booking = BookingAdd(user_id=payload["user_id"], instance_id=instance_id, book_id=book_id)
-    await db.booking.add(booking)
-    instance = InstancePatch(status="BOOKED")
-    await db.instance.edit(instance, exclude_unset=True, id=instance_id)
-    await db.commit()
-    return {"status": "ok"}
+    return await book_instance(book_id, payload["user_id"], db, instance_id=instance_id)
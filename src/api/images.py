@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.routing import APIRoute
+
+from src.config import settings
+from src.services.images import check_upload_size
+from src.services.thumbnails import ThumbnailService
+from src.utils.images import THUMBNAIL_FORMATS
+
+router = APIRouter(prefix="/thumbs", tags=["Изображения"])
+
+
+class ImageUploadRoute(APIRoute):
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def upload_handler(request: Request):
+            check_upload_size(request.headers.get("content-length"))
+            return await handler(request)
+
+        return upload_handler
+
+
+@router.get("/{width}/{image_path:path}", summary="Уменьшенная обложка")
+async def get_thumbnail(width: int, image_path: str):
+    image, _, fmt = image_path.rpartition(".")
+    if width not in settings.THUMBNAIL_WIDTHS or fmt not in THUMBNAIL_FORMATS or not image:
+        raise HTTPException(status_code=404, detail="Изображение не найдено")
+
+    service = ThumbnailService()
+    try:
+        thumbnail = await service.get_thumbnail(image, width, fmt)
+    except Exception:
+        thumbnail = None
+    if thumbnail is None:
+        if service.source_path(image) is None:
+            raise HTTPException(status_code=404, detail="Изображение не найдено")
+        return RedirectResponse(f"/imgs/{image}", status_code=307)
+    return FileResponse(
+        thumbnail,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
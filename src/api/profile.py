@@ -3,14 +3,16 @@ from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from starlette.responses import HTMLResponse, FileResponse
-from fastapi_cache.decorator import cache
+from starlette.responses import HTMLResponse
 
 from src.dependencies.db_dep import DBDep
-from src.dependencies.user_dep import PayloadDep
+from src.dependencies.user_dep import AuthDep, PayloadDep
 from src.schemas.instance import InstancePatch
 from src.schemas.new_added_instance import NewAddedInstanceAdd
 from src.schemas.user import UserPatch
+from src.services.user import UserCacheService
+from src.utils.cache import cache
+from src.utils.pages import page_response
 
 router = APIRouter(prefix="/profile", tags=["Личный кабинет"])
 
@@ -95,8 +97,7 @@ async def get_profile_records(section: str, db: DBDep, payload: PayloadDep):
         return {"items": sort_by_created_at_desc(items)}
     if section == "rent":
         items = sort_latest(await db.instance.get_all(user_id=payload["user_id"]))
-        exchanges_point = await db.exchange_point.get_all()
-        return {"items": items, "exchanges_point": exchanges_point}
+        return {"items": items}
     if section == "booking":
         items = sort_latest(await db.booking.get_all(user_id=payload["user_id"]))
         return {"items": items}
@@ -109,12 +110,12 @@ async def get_profile_records(section: str, db: DBDep, payload: PayloadDep):
     summary="HTML страница профиля"
 )
 async def profile_view_page():
-    return FileResponse(PROFILE_TEMPLATE_PATH)
+    return page_response(PROFILE_TEMPLATE_PATH)
 
 
 @router.get("", summary="Страница профиля")
-async def profile_page(db: DBDep, payload: PayloadDep):
-    user = await db.user.get_one_or_none(id=payload["user_id"])
+async def profile_page(db: DBDep, payload: PayloadDep, auth: AuthDep):
+    user = await auth.get_user(db)
     if not user:
         raise HTTPException(
             status_code=401,
@@ -124,14 +125,12 @@ async def profile_page(db: DBDep, payload: PayloadDep):
     user_own_book = own_records["items"][:3]
     user_rent_book = sort_latest(await db.instance.get_all(user_id=payload["user_id"]))[:3]
     user_booking = sort_latest(await db.booking.get_all(user_id=payload["user_id"]))[:3]
-    exchanges_point = await db.exchange_point.get_all()
 
     context = {
         "user": user,
         "user_own_book": user_own_book,
         "user_rent_book": user_rent_book,
         "user_booking": user_booking,
-        "exchanges_point": exchanges_point,
     }
     return context
 
@@ -141,23 +140,13 @@ async def profile_page(db: DBDep, payload: PayloadDep):
 async def profile_records_view_page(section: str):
     if section not in {"own", "rent", "booking"}:
         raise HTTPException(status_code=404, detail="Раздел не найден")
-    return FileResponse(PROFILE_RECORDS_TEMPLATE_PATH)
+    return page_response(PROFILE_RECORDS_TEMPLATE_PATH)
 
 
 @router.get("/add-book/view", response_class=HTMLResponse,
             summary="HTML страница добавления книги")
 async def profile_add_book_view_page():
-    return FileResponse(PROFILE_ADD_BOOK_TEMPLATE_PATH)
-
-
-@router.get("/add-book", summary="Контекст страницы добавления книги")
-@cache(expire=10)
-async def profile_add_book_page(db: DBDep, payload: PayloadDep):
-    user = await db.user.get_one_or_none(id=payload["user_id"])
-    if not user:
-        raise HTTPException(status_code=401, detail="Вы не авторизованы")
-    exchanges_point = await db.exchange_point.get_all()
-    return {"exchanges_point": exchanges_point}
+    return page_response(PROFILE_ADD_BOOK_TEMPLATE_PATH)
 
 
 @router.post("/add-book", summary="Добавить книгу в профиль")
@@ -190,7 +179,7 @@ async def profile_add_book(payload: PayloadDep, db: DBDep, data: ProfileAddBookR
 async def profile_records_page(section: str, db: DBDep, payload: PayloadDep, page: int = 1):
     records_data = await get_profile_records(section, db, payload)
     paginated_items, page, per_page, total, total_pages = paginate(records_data["items"], page=page, per_page=10)
-    response = {
+    return {
         "items": paginated_items,
         "page": page,
         "per_page": per_page,
@@ -198,9 +187,6 @@ async def profile_records_page(section: str, db: DBDep, payload: PayloadDep, pag
         "total_pages": total_pages,
         "section": section,
     }
-    if "exchanges_point" in records_data:
-        response["exchanges_point"] = records_data["exchanges_point"]
-    return response
 
 
 @router.patch("/{booking_id}")
@@ -245,4 +231,5 @@ async def return_book(instance_id: int, return_data: ReturnBookRequest, db: DBDe
 async def edit(db: DBDep, payload: PayloadDep, user_data: UserPatch):
     await db.user.edit(user_data, exclude_unset=True, id=payload["user_id"])
     await db.commit()
+    await UserCacheService().invalidate(payload["user_id"])
     return {"status": "ok"}
@@ -1,14 +1,14 @@
 from pathlib import Path
 
-from fastapi import APIRouter, Request
-from sqlalchemy import or_, select, func
-from starlette.responses import HTMLResponse, FileResponse
-from fastapi_cache.decorator import cache
+from fastapi import APIRouter, Query, Request
+from starlette.responses import HTMLResponse
 
+from src.config import settings
 from src.dependencies.db_dep import DBDep
-from src.models.exchange_point import ExchangePointORM
-from src.models.organisation import OrganisationORM
-from src.services.user import AuthService
+from src.dependencies.user_dep import get_auth
+from src.services.shelves import shelf_index
+from src.utils.pages import CachedPageResponse, page_response
+from src.utils.ssr import render_index_page
 
 router = APIRouter(prefix="/main", tags=["Главная страница"])
 INDEX_TEMPLATE_PATH = Path(__file__).resolve().parents[1] / "templates" / "index.html"
@@ -46,84 +46,71 @@ async def enrich_books_with_user_flags(db: DBDep, books: list, user_id: int | No
 
 
 @router.get("/view", summary="HTML главная страница", response_class=HTMLResponse)
-async def main_view_page():
-    return FileResponse(INDEX_TEMPLATE_PATH)
+async def main_view_page(db: DBDep, request: Request):
+    if not settings.SSR_ENABLED:
+        return page_response(INDEX_TEMPLATE_PATH)
+    context = await get_main_context(db, request)
+    return render_index_page(INDEX_TEMPLATE_PATH, context)
 
 
 @router.get("/shelves/view", summary="HTML адреса полок", response_class=HTMLResponse)
 async def shelves_view_page():
-    return FileResponse(SHELVES_TEMPLATE_PATH)
+    return page_response(SHELVES_TEMPLATE_PATH)
 
 
-@router.get("", summary="Контекст главной страницы")
-async def main_page(db: DBDep, request: Request):
-    user = None
-    access_token = request.cookies.get("access_token")
-    if access_token:
-        try:
-            payload = AuthService().decode_token(access_token)
-            user = await db.user.get_one_or_none(id=payload["user_id"])
-        except Exception:
-            user = None
+async def get_main_context(db: DBDep, request: Request):
+    user = await get_auth(request).get_user(db)
     books = await db.book.get_all()
     user_id = user.id if user else None
     books_payload = await enrich_books_with_user_flags(db, books, user_id)
-    exchange_points = await db.exchange_point.get_all()
-    organisations = [
-        {
-            "id": point.id,
-            "name": point.organisation.name if point.organisation else "-",
-            "address": point.address,
-            "description": point.description,
-        }
-        for point in exchange_points
-    ]
-    context = {"user": user, "books": books_payload[:9], "organisations": organisations[:3]}
+    snapshot = await shelf_index.get()
+    context = {"user": user, "books": books_payload[:9], "organisations": snapshot.items[:3]}
     return context
 
 
+@router.get("", summary="Контекст главной страницы")
+async def main_page(db: DBDep, request: Request):
+    return await get_main_context(db, request)
+
+
+@router.get("/shelves/nearest", summary="Ближайшие полки")
+async def nearest_shelves(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    limit: int = Query(5, ge=1, le=50),
+):
+    snapshot = await shelf_index.get()
+    return {
+        "items": [
+            shelf | {"distance_km": round(distance, 3)}
+            for shelf, distance in snapshot.nearest(lat, lon, limit)
+        ]
+    }
+
+
+@router.get("/shelves/directory", summary="Справочник адресов полок")
+async def shelves_directory():
+    snapshot = await shelf_index.get()
+    return CachedPageResponse(snapshot.directory, media_type="application/json")
+
+
+@router.get("/shelves/suggest", summary="Подсказки адресов полок")
+async def shelves_suggest(q: str = Query(max_length=100), limit: int = Query(10, ge=1, le=50)):
+    snapshot = await shelf_index.get()
+    return {"items": snapshot.suggest(q, limit)}
+
+
 @router.get("/shelves", summary="Все адреса полок")
-@cache(expire=20)
-async def shelves_page(db: DBDep, q: str | None = None, page: int = 1):
+async def shelves_page(q: str | None = None, page: int = 1):
+    snapshot = await shelf_index.get()
+    items = snapshot.search(q)
     page = max(page, 1)
     per_page = 10
-    query = q.strip() if q else None
-
-    organisations_query = (
-        select(ExchangePointORM, OrganisationORM)
-        .join(OrganisationORM, OrganisationORM.id == ExchangePointORM.organisation_id)
-        .order_by(OrganisationORM.name.asc(), ExchangePointORM.address.asc())
-    )
-    count_query = (
-        select(func.count(ExchangePointORM.id))
-        .select_from(ExchangePointORM)
-        .join(OrganisationORM, OrganisationORM.id == ExchangePointORM.organisation_id)
-    )
-    if query:
-        search_condition = or_(
-            OrganisationORM.name.icontains(query),
-            ExchangePointORM.address.icontains(query),
-        )
-        organisations_query = organisations_query.where(search_condition)
-        count_query = count_query.where(search_condition)
-
-    organisations_query = organisations_query.offset((page - 1) * per_page).limit(per_page)
-
-    result = await db.session.execute(organisations_query)
-    organisations = [
-        {
-            "id": point.id,
-            "name": organisation.name if organisation else "-",
-            "address": point.address,
-            "description": point.description or (organisation.description if organisation else None),
-        }
-        for point, organisation in result.all()
-    ]
-    total = (await db.session.execute(count_query)).scalar_one()
+    total = len(items)
     total_pages = (total + per_page - 1) // per_page if total > 0 else 0
 
     return {
-        "items": organisations,
+        "items": items[(page - 1) * per_page:page * per_page],
         "page": page,
         "per_page": per_page,
         "total": total,
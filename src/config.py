@@ -12,11 +12,31 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_PGBOUNCER: bool = False
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_HEALTH_INTERVAL_SECONDS: float = 10.0
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 10.0
+    DATABASE_READ_YOUR_WRITES_SECONDS: int = 5
     REDIS_URL: str
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_CONNECT_TIMEOUT: float = 2.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
 
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_HOURS: int
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
 
     SMTP_HOST: str | None = None
     SMTP_PORT: int = 587
@@ -25,5 +45,70 @@ class Settings(BaseSettings):
     SMTP_FROM: str | None = None
     SMTP_STARTTLS: bool = True
     SMTP_SSL: bool = False
+    SMTP_TIMEOUT_SECONDS: int = 20
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2.0
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: int = 30
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 600
+
+    BOOKING_HOLD_HOURS: int = 72
+    BOOKING_SWEEP_INTERVAL_SECONDS: int = 300
+    BOOKING_SWEEP_BATCH_SIZE: int = 500
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_RULES: dict[str, list[float]] = {
+        "POST /auth/login": [10, 0.2],
+        "POST /auth/register": [5, 0.05],
+        "POST /auth/verify-email": [10, 0.2],
+        "POST /auth/verify-email/resend": [3, 0.02],
+    }
+    RATE_LIMIT_CACHE_MISS_RULES: dict[str, list[float]] = {
+        "GET /book/catalog": [60, 2],
+    }
+    RATE_LIMIT_REDIS_RETRY_SECONDS: float = 5.0
+
+    IMAGE_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    THUMBNAIL_WIDTHS: list[int] = [160, 320, 640]
+    THUMBNAIL_WORKERS: int = 2
+
+    CACHE_COMPRESS_MIN_SIZE: int = 1024
+    CACHE_COMPRESS_LEVEL: int = 6
+
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str | None = None
+    PROMETHEUS_MULTIPROC_DIR: str | None = None
+    SERVER_TIMING_ENABLED: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_RELOAD: bool = False
+    SERVER_LOOP: str = "uvloop"
+    SERVER_HTTP: str = "httptools"
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE_SECONDS: int = 5
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    SERVER_MAX_REQUESTS: int | None = None
+    SERVER_ACCESS_LOG: bool = True
+    SERVER_WARM_UP: bool = True
+    SERVER_WARM_UP_TIMEOUT_SECONDS: float = 10.0
+    STARTUP_IMPORT_BUDGET_MS: float = 1200.0
+    STARTUP_FIRST_REQUEST_BUDGET_MS: float = 1500.0
+
+    SHELVES_VERSION_CHECK_SECONDS: float = 2.0
+    BOOK_SUGGEST_CHECK_SECONDS: float = 2.0
+    BOOK_SUGGEST_CHANGES_LIMIT: int = 10000
+    BOOK_SUGGEST_SCAN_LIMIT: int = 5000
+
+    TEMPLATES_RELOAD: bool = False
+    SSR_ENABLED: bool = False
+    SSR_FRAGMENT_CACHE_SIZE: int = 2048
 
 settings = Settings()
@@ -1,17 +1,147 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import AsyncExitStack
+
+from sqlalchemy import make_url, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from src.config import settings
+from src.utils.db_pool import PoolMetrics, engine_options
+from src.utils.metrics import instrument_engine
 
-DATABASE_URL = settings.DATABASE_URL.replace(
-    "postgresql://",
-    "postgresql+asyncpg://"
-)
+logger = logging.getLogger(__name__)
+
+
+def to_async_url(url: str) -> str:
+    return url.replace("postgresql://", "postgresql+asyncpg://")
+
+
+def create_engine(url, metrics: PoolMetrics):
+    engine = create_async_engine(url, **engine_options(metrics))
+    metrics.attach(engine)
+    instrument_engine(engine)
+    return engine
+
+
+DATABASE_URL = to_async_url(settings.DATABASE_URL)
 
-engine = create_async_engine(DATABASE_URL)
+pool_metrics = PoolMetrics()
+engine = create_engine(DATABASE_URL, pool_metrics)
 
 async_session = async_sessionmaker(bind=engine, expire_on_commit=False)
 
 
+def read_only_sessionmaker(bind):
+    return async_sessionmaker(
+        bind=bind.execution_options(isolation_level="AUTOCOMMIT"),
+        expire_on_commit=False,
+    )
+
+
+read_only_session = read_only_sessionmaker(engine)
+
+REPLICA_LAG_QUERY = text(
+    "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+)
+
+
+class Replica:
+    def __init__(self, url: str):
+        url = make_url(to_async_url(url))
+        self.name = url.render_as_string(hide_password=True)
+        self.pool_metrics = PoolMetrics(self.name)
+        self.engine = create_engine(url, self.pool_metrics)
+        self.session_factory = read_only_sessionmaker(self.engine)
+        self.healthy = True
+        self.lag = None
+        self.error = None
+        self.checked_at = None
+
+
+class ReplicaRouter:
+    def __init__(self, urls: list[str], max_lag: float, interval: float):
+        self.replicas = [Replica(url) for url in urls]
+        self.max_lag = max_lag
+        self.interval = interval
+        self.counter = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Replica | None:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self.counter) % len(healthy)]
+
+    def mark_failed(self, replica: Replica, error: Exception) -> None:
+        if replica.healthy:
+            logger.warning("Replica %s marked unhealthy: %s", replica.name, error)
+        replica.healthy = False
+        replica.error = str(error) or error.__class__.__name__
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            async with asyncio.timeout(self.interval):
+                async with replica.engine.connect() as conn:
+                    lag = float((await conn.execute(REPLICA_LAG_QUERY)).scalar_one())
+        except Exception as exc:
+            self.mark_failed(replica, exc)
+        else:
+            replica.lag = lag
+            replica.healthy = lag <= self.max_lag
+            replica.error = None if replica.healthy else f"lag {lag:.1f}s"
+        replica.checked_at = time.time()
+
+    async def run_health_checks(self):
+        while True:
+            await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+            await asyncio.sleep(self.interval)
+
+    def health(self) -> list[dict]:
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.healthy,
+                "lag": replica.lag,
+                "error": replica.error,
+                "checked_at": replica.checked_at,
+                "pool": replica.pool_metrics.snapshot(),
+            }
+            for replica in self.replicas
+        ]
+
+    async def close(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+async def warm_up_engine(engine, connections: int) -> None:
+    async with AsyncExitStack() as stack:
+        for _ in range(connections):
+            conn = await stack.enter_async_context(engine.connect())
+            await conn.execute(text("SELECT 1"))
+
+
+async def warm_up_pools() -> None:
+    await warm_up_engine(engine, settings.DATABASE_POOL_SIZE)
+    for replica in replica_router.replicas:
+        try:
+            await warm_up_engine(replica.engine, settings.DATABASE_POOL_SIZE)
+        except Exception as exc:
+            replica_router.mark_failed(replica, exc)
+
+
+replica_router = ReplicaRouter(
+    settings.DATABASE_REPLICA_URLS,
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    interval=settings.DATABASE_REPLICA_HEALTH_INTERVAL_SECONDS,
+)
+
+
 class Base(DeclarativeBase):
     pass
@@ -1,14 +1,29 @@
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Request
+from sqlalchemy.exc import InterfaceError, OperationalError
 
-from src.database import async_session
+from src.database import async_session, read_only_session, replica_router
+from src.middlewares.read_your_writes import READ_METHODS, prefers_primary
 from src.utils.db_manager import DBManager
 
 
-async def get_db():
-    async with DBManager(session_factory=async_session) as db:
-        yield db
+async def get_db(request: Request):
+    replica = None
+    read_only = request.method in READ_METHODS
+    if read_only and not prefers_primary(request):
+        replica = replica_router.pick()
+    if replica is not None:
+        session_factory = replica.session_factory
+    else:
+        session_factory = read_only_session if read_only else async_session
+    async with DBManager(session_factory=session_factory, read_only=read_only) as db:
+        try:
+            yield db
+        except (InterfaceError, OperationalError, OSError) as exc:
+            if replica is not None:
+                replica_router.mark_failed(replica, exc)
+            raise
 
 
 DBDep = Annotated[DBManager, Depends(get_db)]
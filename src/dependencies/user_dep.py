@@ -2,17 +2,30 @@ from typing import Annotated
 
 from fastapi import Depends, Request, HTTPException
 
-from src.services.user import AuthService
+from src.middlewares.auth_context import AuthContext
 
 
-def get_payload(request: Request):
-    jwt_token = request.cookies.get("access_token")
-    if not jwt_token:
+def get_auth(request: Request) -> AuthContext:
+    auth = getattr(request.state, "auth", None)
+    if auth is None:
+        auth = AuthContext(request.cookies.get("access_token"))
+        request.state.auth = auth
+    return auth
+
+
+def get_payload(auth: Annotated[AuthContext, Depends(get_auth)]):
+    if not auth.token:
         raise HTTPException(
             status_code=401,
             detail="Вы не авторизованы",
         )
-    return AuthService().decode_token(jwt_token)
+    if auth.payload is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Неверный токен",
+        )
+    return auth.payload
 
 
+AuthDep = Annotated[AuthContext, Depends(get_auth)]
 PayloadDep = Annotated[dict, Depends(get_payload)]
@@ -1,4 +1,10 @@
 from src.config import settings
 from src.redis_connector import RedisManager
 
-redis_manager = RedisManager(url=settings.REDIS_URL)
+redis_manager = RedisManager(
+    url=settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+    health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+)
@@ -1,6 +1,7 @@
-import uvicorn
+import asyncio
+import logging
+import os
 from contextlib import asynccontextmanager
-from html import escape
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
@@ -9,55 +10,140 @@ from fastapi.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
-
-import sys
 from pathlib import Path
 
-from starlette.responses import HTMLResponse, FileResponse
-
-sys.path.append(str(Path(__file__).resolve().parents[1]))
+from starlette.responses import HTMLResponse
 
 from src.api.auth import router as auth_router
 from src.api.profile import router as profile_router
-from src.api.view import router as view_router
+from src.api.view import main_view_page, router as view_router
 from src.api.book import router as book_router
 from src.api.admin import router as admin_router
+from src.api.images import router as images_router
+from src.config import settings
+from src.database import replica_router, warm_up_pools
 from src.init import redis_manager
+from src.middlewares.auth_context import AuthContextMiddleware
+from src.middlewares.compression import CompressionMiddleware
+from src.middlewares.metrics import MetricsMiddleware
+from src.middlewares.read_your_writes import ReadYourWritesMiddleware
+from src.middlewares.rate_limit import RateLimitMiddleware
+from src.services.booking import BookingService
+from src.services.images import IMAGES_DIR, is_hashed_image_name
+from src.services.suggestions import book_suggest_index
+from src.services.thumbnails import ThumbnailService
+from src.utils.assets import STATIC_BUILD_DIR, PrecompressedStaticFiles, static_assets
+from src.utils.metrics import TimedJSONResponse, mark_process_dead, metrics_registry
+from src.utils.pages import error_template, page_cache
+from src.utils.cache import CompressedJsonCoder
+
+logger = logging.getLogger(__name__)
 
 
 class CachedImagesStaticFiles(StaticFiles):
-    def __init__(self, *args, cache_control: str = "public, max-age=2592000, immutable", **kwargs):
+    def __init__(self, *args, cache_control: str = "public, max-age=31536000, immutable",
+                 legacy_cache_control: str = "no-cache", **kwargs):
         super().__init__(*args, **kwargs)
         self.cache_control = cache_control
+        self.legacy_cache_control = legacy_cache_control
 
-    def file_response(self, *args, **kwargs):
-        response = super().file_response(*args, **kwargs)
+    async def get_response(self, path: str, scope):
+        name = Path(path)
+        if any(part.startswith(".") for part in name.parts):
+            raise StarletteHTTPException(status_code=404)
+        response = await super().get_response(path, scope)
         if "cache-control" not in response.headers:
-            response.headers["Cache-Control"] = self.cache_control
+            hashed = is_hashed_image_name(name.as_posix())
+            response.headers["Cache-Control"] = self.cache_control if hashed else self.legacy_cache_control
         return response
 
 
+async def warm_up_connections():
+    try:
+        async with asyncio.timeout(settings.SERVER_WARM_UP_TIMEOUT_SECONDS):
+            await asyncio.gather(warm_up_pools(), redis_manager.warm_up())
+    except Exception:
+        logger.exception("Connection warm-up failed, connections will be opened on demand")
+
+
 async def lifespan(app: FastAPI):
+    try:
+        await asyncio.to_thread(static_assets.ensure_built)
+    except OSError:
+        logger.exception("Static assets build failed, serving the last built manifest")
+        static_assets.load()
+    page_cache.load_all()
     await redis_manager.connect()
-    FastAPICache.init(RedisBackend(redis_manager.redis), prefix="fastapi_cache")
+    FastAPICache.init(
+        RedisBackend(redis_manager.redis),
+        prefix="fastapi_cache",
+        coder=CompressedJsonCoder,
+    )
+    if settings.SERVER_WARM_UP:
+        await warm_up_connections()
+    background_tasks = [
+        asyncio.create_task(BookingService().run_sweeper()),
+        asyncio.create_task(book_suggest_index.warm_up()),
+    ]
+    if settings.SMTP_HOST:
+        from src.services.email import EmailOutboxService
+
+        background_tasks.append(asyncio.create_task(EmailOutboxService().run_worker()))
+    if replica_router.enabled:
+        background_tasks.append(asyncio.create_task(replica_router.run_health_checks()))
     yield
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    ThumbnailService.shutdown()
+    await replica_router.close()
     await redis_manager.close()
+    mark_process_dead(os.getpid())
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=TimedJSONResponse)
+app.add_middleware(
+    RateLimitMiddleware,
+    redis_manager=redis_manager,
+    rules=settings.RATE_LIMIT_RULES,
+    cache_miss_rules=settings.RATE_LIMIT_CACHE_MISS_RULES,
+    redis_retry_seconds=settings.RATE_LIMIT_REDIS_RETRY_SECONDS,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
+app.add_middleware(AuthContextMiddleware)
+if replica_router.enabled:
+    app.add_middleware(
+        ReadYourWritesMiddleware,
+        window_seconds=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+    )
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+if settings.METRICS_ENABLED:
+    app.add_middleware(
+        MetricsMiddleware,
+        registry=metrics_registry,
+        server_timing=settings.SERVER_TIMING_ENABLED,
+    )
 app.include_router(auth_router)
 app.include_router(profile_router)
 app.include_router(view_router)
+app.add_api_route("/", main_view_page, summary="HTML главная страница", response_class=HTMLResponse)
 app.include_router(book_router)
 app.include_router(admin_router)
+app.include_router(images_router)
 app.mount(
     "/imgs",
-    CachedImagesStaticFiles(directory=Path(__file__).resolve().parent / "imgs"),
+    CachedImagesStaticFiles(directory=IMAGES_DIR),
     name="imgs"
 )
 app.mount(
     "/static",
-    StaticFiles(directory=Path(__file__).resolve().parent / "static"),
+    PrecompressedStaticFiles(directory=STATIC_BUILD_DIR, check_dir=False),
     name="static"
 )
 
@@ -76,18 +162,14 @@ def wants_html(request: Request) -> bool:
 
 
 def render_error_html(status_code: int, title: str, detail: str) -> HTMLResponse:
-    html = ERROR_TEMPLATE_PATH.read_text(encoding="utf-8")
-    html = html.replace("__STATUS_CODE__", escape(str(status_code)))
-    html = html.replace("__TITLE__", escape(title))
-    html = html.replace("__DETAIL__", escape(detail))
+    html = error_template(ERROR_TEMPLATE_PATH).render(
+        status_code=str(status_code),
+        title=title,
+        detail=detail,
+    )
     return HTMLResponse(content=html, status_code=status_code)
 
 
-@app.get("/", summary="HTML главная страница", response_class=HTMLResponse)
-async def main_view_page():
-    return FileResponse(INDEX_TEMPLATE_PATH)
-
-
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     detail = str(exc.detail) if getattr(exc, "detail", None) else "Произошла ошибка"
@@ -116,4 +198,6 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
 
 
 if __name__ == "__main__":
-    uvicorn.run("src.main:app", reload=True)
+    from src.server import main as run_server
+
+    run_server()
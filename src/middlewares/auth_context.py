@@ -0,0 +1,58 @@
+from starlette.requests import Request
+
+from src.schemas.user import User
+from src.services.user import AuthService, UserCacheService
+
+
+class AuthContext:
+    def __init__(self, token: str | None):
+        self.token = token
+        self.payload = None
+        self._user = None
+        self._user_loaded = False
+        if token:
+            try:
+                self.payload = AuthService().decode_token(token)
+            except Exception:
+                self.payload = None
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.payload is not None
+
+    @property
+    def user_id(self) -> int | None:
+        if self.payload is None:
+            return None
+        return self.payload.get("user_id")
+
+    @property
+    def role(self) -> str | None:
+        if self.payload is None:
+            return None
+        return self.payload.get("role")
+
+    async def get_user(self, db) -> User | None:
+        if self._user_loaded:
+            return self._user
+        self._user_loaded = True
+        if self.user_id is None:
+            return None
+        user_cache = UserCacheService()
+        self._user = await user_cache.get(self.user_id)
+        if self._user is None:
+            self._user = await db.user.get_one_or_none(id=self.user_id)
+            if self._user is not None:
+                await user_cache.set(self._user)
+        return self._user
+
+
+class AuthContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            token = Request(scope).cookies.get("access_token")
+            scope.setdefault("state", {})["auth"] = AuthContext(token)
+        await self.app(scope, receive, send)
@@ -0,0 +1,67 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from src.utils.metrics import (
+    MetricsRegistry,
+    RequestTimings,
+    request_timings,
+    server_timing_header,
+)
+from src.utils.query_budget import check_request_queries
+
+
+def route_template(scope, root_path: str) -> str:
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    mounted_at = scope.get("root_path", "")
+    if mounted_at != root_path:
+        return f"{mounted_at[len(root_path):]}/{{path}}"
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: MetricsRegistry, server_timing: bool = True):
+        self.app = app
+        self.registry = registry
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(parent=request_timings.get())
+        token = request_timings.set(timings)
+        root_path = scope.get("root_path", "")
+        started = time.perf_counter()
+        status_code = 500
+        self.registry.in_flight.inc()
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        server_timing_header(timings, time.perf_counter() - started),
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.registry.in_flight.dec()
+            route = route_template(scope, root_path)
+            self.registry.observe_request(
+                scope["method"],
+                route,
+                status_code,
+                time.perf_counter() - started,
+                timings,
+            )
+            check_request_queries(scope["method"], route, timings)
+            request_timings.reset(token)
@@ -0,0 +1,158 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from functools import partial
+
+from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from src.middlewares.auth_context import AuthContext
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_DETAIL = "Слишком много запросов, попробуйте позже"
+
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local ttl = math.ceil(capacity / rate) + 1
+local allowed = 1
+local retry_after = 0
+local states = {}
+for i, key in ipairs(KEYS) do
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        allowed = 0
+        retry_after = math.max(retry_after, (1 - tokens) / rate)
+    end
+    states[i] = tokens
+end
+for i, key in ipairs(KEYS) do
+    local tokens = states[i]
+    if allowed == 1 then
+        tokens = tokens - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', key, ttl)
+end
+return {allowed, tostring(retry_after)}
+"""
+
+
+class LocalTokenBuckets:
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.buckets = OrderedDict()
+
+    def consume(self, keys: list[str], capacity: float, rate: float) -> tuple[bool, float]:
+        now = time.monotonic()
+        states = []
+        retry_after = 0.0
+        for key in keys:
+            tokens, ts = self.buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            if tokens < 1:
+                retry_after = max(retry_after, (1 - tokens) / rate)
+            states.append(tokens)
+        allowed = retry_after == 0
+        for key, tokens in zip(keys, states):
+            self.buckets[key] = (tokens - 1 if allowed else tokens, now)
+            self.buckets.move_to_end(key)
+        while len(self.buckets) > self.max_size:
+            self.buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+def retry_after_headers(retry_after: float) -> dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(retry_after)))}
+
+
+async def limit_cache_miss(request: Request) -> None:
+    limiter = getattr(request.state, "cache_miss_limiter", None)
+    if limiter is not None:
+        await limiter()
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app,
+        redis_manager,
+        rules: dict[str, list[float]],
+        cache_miss_rules: dict[str, list[float]] | None = None,
+        redis_retry_seconds: float = 5.0,
+        enabled: bool = True,
+    ):
+        self.app = app
+        self.redis_manager = redis_manager
+        self.rules = rules
+        self.cache_miss_rules = cache_miss_rules or {}
+        self.redis_retry_seconds = redis_retry_seconds
+        self.redis_down_until = 0.0
+        self.enabled = enabled
+        self.local_buckets = LocalTokenBuckets()
+
+    def bucket_keys(self, rule_name: str, request: Request) -> list[str]:
+        client_ip = request.client.host if request.client else "unknown"
+        keys = [f"ratelimit:{rule_name}:ip:{client_ip}"]
+        auth = getattr(request.state, "auth", None)
+        if auth is None:
+            auth = AuthContext(request.cookies.get("access_token"))
+        if auth.user_id:
+            keys.append(f"ratelimit:{rule_name}:user:{auth.user_id}")
+        return keys
+
+    async def consume(self, keys: list[str], capacity: float, rate: float) -> tuple[bool, float]:
+        if time.monotonic() < self.redis_down_until:
+            return self.local_buckets.consume(keys, capacity, rate)
+        try:
+            script = self.redis_manager.scripts.get("token_bucket")
+            if script is None:
+                script = self.redis_manager.register_script("token_bucket", TOKEN_BUCKET_LUA)
+            allowed, retry_after = await script(keys=keys, args=[capacity, rate])
+            return bool(allowed), float(retry_after)
+        except Exception as exc:
+            self.redis_down_until = time.monotonic() + self.redis_retry_seconds
+            logger.warning(
+                "Redis rate limiter unavailable, using local buckets for %ss: %s", self.redis_retry_seconds, exc
+            )
+            return self.local_buckets.consume(keys, capacity, rate)
+
+    async def enforce(self, rule_name: str, rule: list[float], scope) -> None:
+        capacity, rate = rule
+        allowed, retry_after = await self.consume(self.bucket_keys(rule_name, Request(scope)), capacity, rate)
+        if not allowed:
+            raise HTTPException(status_code=429, detail=RATE_LIMIT_DETAIL, headers=retry_after_headers(retry_after))
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rule_name = f"{scope['method']} {scope['path']}"
+        miss_rule = self.cache_miss_rules.get(rule_name)
+        if miss_rule is not None:
+            scope.setdefault("state", {})["cache_miss_limiter"] = partial(self.enforce, rule_name, miss_rule, scope)
+        rule = self.rules.get(rule_name)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        capacity, rate = rule
+        keys = self.bucket_keys(rule_name, Request(scope))
+        allowed, retry_after = await self.consume(keys, capacity, rate)
+        if not allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": RATE_LIMIT_DETAIL},
+                headers=retry_after_headers(retry_after),
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -20,6 +20,7 @@ from src.models.user import UserORM
 from src.models.exchange_point import ExchangePointORM
 from src.models.organisation import OrganisationORM
 from src.models.new_added_instance import NewAddedInstanceORM
+from src.models.email_outbox import EmailOutboxORM
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
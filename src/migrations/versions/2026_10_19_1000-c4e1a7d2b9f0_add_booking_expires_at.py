@@ -0,0 +1,34 @@
+"""add expires_at to booking
+
+Revision ID: c4e1a7d2b9f0
+Revises: b8d9f2a1c3e4
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e1a7d2b9f0"
+down_revision: Union[str, Sequence[str], None] = "b8d9f2a1c3e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "booking",
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_booking_expires_at"), "booking", ["expires_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_booking_expires_at"), table_name="booking")
+    op.drop_column("booking", "expires_at")
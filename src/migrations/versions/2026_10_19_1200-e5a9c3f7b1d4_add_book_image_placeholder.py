@@ -0,0 +1,27 @@
+"""add image_placeholder to book
+
+Revision ID: e5a9c3f7b1d4
+Revises: d2f8b6a1e3c7
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a9c3f7b1d4"
+down_revision: Union[str, Sequence[str], None] = "d2f8b6a1e3c7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("book", sa.Column("image_placeholder", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("book", "image_placeholder")
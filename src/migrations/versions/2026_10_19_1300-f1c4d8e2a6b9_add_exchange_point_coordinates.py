@@ -0,0 +1,37 @@
+"""add coordinates to exchange_point
+
+Revision ID: f1c4d8e2a6b9
+Revises: e5a9c3f7b1d4
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c4d8e2a6b9"
+down_revision: Union[str, Sequence[str], None] = "e5a9c3f7b1d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("exchange_point", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("exchange_point", sa.Column("longitude", sa.Float(), nullable=True))
+    op.create_check_constraint(
+        "ck_exchange_point_coordinates",
+        "exchange_point",
+        "(latitude IS NULL AND longitude IS NULL) OR "
+        "(latitude IS NOT NULL AND longitude IS NOT NULL AND "
+        "latitude BETWEEN -90 AND 90 AND longitude BETWEEN -180 AND 180)",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_exchange_point_coordinates", "exchange_point", type_="check")
+    op.drop_column("exchange_point", "longitude")
+    op.drop_column("exchange_point", "latitude")
@@ -16,4 +16,5 @@ class BookORM(Base):
     isbn: Mapped[str | None]
     description: Mapped[str | None]
     image: Mapped[str | None]
+    image_placeholder: Mapped[str | None]
     author = relationship("AuthorORM", lazy="selectin")
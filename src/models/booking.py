@@ -1,4 +1,6 @@
-from sqlalchemy import ForeignKey
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, DateTime
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from src.database import Base
@@ -11,4 +13,7 @@ class BookingORM(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
     instance_id: Mapped[int] = mapped_column(ForeignKey("instance.id"))
     book_id: Mapped[int] = mapped_column(ForeignKey("book.id"))
+    expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), index=True
+    )
     instance = relationship("InstanceORM", lazy="selectin")
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey
+from sqlalchemy import CheckConstraint, ForeignKey
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from src.database import Base
@@ -6,9 +6,19 @@ from src.database import Base
 
 class ExchangePointORM(Base):
     __tablename__ = "exchange_point"
+    __table_args__ = (
+        CheckConstraint(
+            "(latitude IS NULL AND longitude IS NULL) OR "
+            "(latitude IS NOT NULL AND longitude IS NOT NULL AND "
+            "latitude BETWEEN -90 AND 90 AND longitude BETWEEN -180 AND 180)",
+            name="ck_exchange_point_coordinates",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     organisation_id: Mapped[int] = mapped_column(ForeignKey("organisation.id"))
     address: Mapped[str]
     description: Mapped[str | None]
+    latitude: Mapped[float | None]
+    longitude: Mapped[float | None]
     organisation = relationship("OrganisationORM", lazy="selectin")
@@ -1,13 +1,111 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+
+from src.utils.metrics import timed
+
+INCR_WITH_EXPIRE_LUA = """
+local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+if tonumber(ARGV[2]) > 0 and redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return value
+"""
+
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class TimedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        with timed("redis"):
+            return await super().execute(raise_on_error)
+
+
+class TimedRedis(redis.Redis):
+    async def execute_command(self, *args, **options):
+        with timed("redis"):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> TimedPipeline:
+        return TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class CountingConnectionPool(redis.ConnectionPool):
+    def __init__(self, *args, **kwargs):
+        self.in_use = 0
+        self.created = 0
+        super().__init__(*args, **kwargs)
+
+    def reset(self):
+        super().reset()
+        self.in_use = 0
+        self.created = 0
+
+    def make_connection(self):
+        connection = super().make_connection()
+        self.created += 1
+        return connection
+
+    def get_available_connection(self):
+        connection = super().get_available_connection()
+        self.in_use += 1
+        return connection
+
+    async def release(self, connection) -> None:
+        await super().release(connection)
+        self.in_use -= 1
 
 
 class RedisManager:
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        max_connections: int | None = None,
+        socket_timeout: float | None = None,
+        socket_connect_timeout: float | None = None,
+        health_check_interval: int = 0,
+    ):
         self.url = url
+        self.max_connections = max_connections
+        self.socket_timeout = socket_timeout
+        self.socket_connect_timeout = socket_connect_timeout
+        self.health_check_interval = health_check_interval
+        self.pool = None
         self.redis = None
+        self.scripts = {}
 
     async def connect(self):
-        self.redis = await redis.from_url(url=self.url)
+        self.pool = CountingConnectionPool.from_url(
+            self.url,
+            max_connections=self.max_connections,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_connect_timeout,
+            health_check_interval=self.health_check_interval,
+        )
+        self.redis = TimedRedis(connection_pool=self.pool)
+        self.register_script("incr_with_expire", INCR_WITH_EXPIRE_LUA)
+        self.register_script("release_lock", RELEASE_LOCK_LUA)
+
+    async def warm_up(self, connections: int = 1):
+        await asyncio.gather(*(self.redis.ping() for _ in range(connections)))
+        for script in self.scripts.values():
+            await self.redis.script_load(script.script)
+
+    def register_script(self, name: str, lua: str):
+        self.scripts[name] = self.redis.register_script(lua)
+        return self.scripts[name]
+
+    async def run_script(self, name: str, keys: list[str] = (), args: list = ()):
+        return await self.scripts[name](keys=list(keys), args=list(args))
 
     async def set(self, key: str, value: str, expire: int = None):
         if expire:
@@ -18,9 +116,76 @@ class RedisManager:
     async def get(self, key: str):
         return await self.redis.get(key)
 
-    async def delete(self, key: str):
-        await self.redis.delete(key)
+    async def delete(self, *keys: str):
+        if keys:
+            await self.redis.delete(*keys)
+
+    async def mget(self, keys: list[str]):
+        if not keys:
+            return []
+        return await self.redis.mget(keys)
+
+    async def mset(self, mapping: dict, expire: int = None):
+        if not mapping:
+            return
+        if not expire:
+            await self.redis.mset(mapping)
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=expire)
+            await pipe.execute()
+
+    def pipeline(self, transaction: bool = False):
+        return self.redis.pipeline(transaction=transaction)
+
+    async def transaction(self, func, *watches: str):
+        return await self.redis.transaction(func, *watches, value_from_callable=True)
+
+    async def incr(self, key: str, amount: int = 1, expire: int = 0) -> int:
+        return int(await self.run_script("incr_with_expire", keys=[key], args=[amount, expire]))
+
+    async def acquire_lock(self, key: str, expire: int = 10) -> str | None:
+        token = uuid.uuid4().hex
+        if await self.redis.set(key, token, nx=True, ex=expire):
+            return token
+        return None
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        return bool(await self.run_script("release_lock", keys=[key], args=[token]))
+
+    @asynccontextmanager
+    async def lock(self, key: str, expire: int = 10):
+        token = await self.acquire_lock(key, expire)
+        try:
+            yield token is not None
+        finally:
+            if token:
+                await self.release_lock(key, token)
+
+    def pool_stats(self) -> dict:
+        return {
+            "max_connections": self.pool.max_connections,
+            "created": self.pool.created,
+            "in_use": self.pool.in_use,
+            "available": self.pool.created - self.pool.in_use,
+        }
+
+    async def health(self) -> dict:
+        started = time.perf_counter()
+        try:
+            await self.redis.ping()
+        except Exception as exc:
+            return {"ok": False, "error": str(exc)}
+        latency_ms = (time.perf_counter() - started) * 1000
+        return {
+            "ok": True,
+            "latency_ms": round(latency_ms, 3),
+            "pool": self.pool_stats(),
+        }
 
     async def close(self):
         if self.redis:
-            await self.redis.close()
+            await self.redis.aclose()
+        if self.pool:
+            await self.pool.disconnect()
@@ -1,4 +1,9 @@
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, literal, select, update
+
 from src.models.booking import BookingORM
+from src.models.instance import InstanceORM
 from src.repositories.base import BaseRepository
 from src.schemas.booking import Booking
 
@@ -6,3 +11,76 @@ from src.schemas.booking import Booking
 class BookingRepository(BaseRepository):
     model = BookingORM
     schema = Booking
+
+    async def book_free_instance(
+        self,
+        user_id: int,
+        book_id: int,
+        instance_id: int | None = None,
+        expires_at: datetime | None = None,
+    ):
+        if instance_id is None:
+            instance_id = (
+                select(InstanceORM.id)
+                .where(InstanceORM.book_id == book_id, InstanceORM.status == "FREE")
+                .order_by(InstanceORM.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+        claimed = (
+            update(InstanceORM)
+            .where(
+                InstanceORM.id == instance_id,
+                InstanceORM.book_id == book_id,
+                InstanceORM.status == "FREE",
+            )
+            .values(status="BOOKED")
+            .returning(InstanceORM.id, InstanceORM.book_id)
+            .cte("claimed")
+        )
+        booking_stmt = (
+            insert(self.model)
+            .from_select(
+                ["user_id", "instance_id", "book_id", "expires_at"],
+                select(
+                    literal(user_id),
+                    claimed.c.id,
+                    claimed.c.book_id,
+                    literal(expires_at, self.model.expires_at.type),
+                ),
+            )
+            .returning(self.model.id, self.model.instance_id)
+        )
+        row = (await self.session.execute(booking_stmt)).one_or_none()
+        if row is None:
+            return None
+        return {"id": row.id, "instance_id": row.instance_id}
+
+    async def release_expired(self, now: datetime, limit: int) -> int:
+        expired = (
+            select(self.model.id)
+            .where(self.model.expires_at <= now)
+            .order_by(self.model.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("expired")
+        )
+        deleted = (
+            delete(self.model)
+            .where(self.model.id.in_(select(expired.c.id)))
+            .returning(self.model.instance_id)
+            .cte("deleted")
+        )
+        released = (
+            update(InstanceORM)
+            .where(
+                InstanceORM.id.in_(select(deleted.c.instance_id)),
+                InstanceORM.status == "BOOKED",
+            )
+            .values(status="FREE")
+            .returning(InstanceORM.id)
+            .cte("released")
+        )
+        release_stmt = select(func.count()).select_from(deleted).add_cte(released)
+        return (await self.session.execute(release_stmt)).scalar_one()
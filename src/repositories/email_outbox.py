@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from src.models.email_outbox import EmailOutboxORM
+from src.repositories.base import BaseRepository
+from src.schemas.email_outbox import EmailOutbox
+
+
+class EmailOutboxRepository(BaseRepository):
+    model = EmailOutboxORM
+    schema = EmailOutbox
+
+    async def claim_batch(self, now: datetime, limit: int, lease_until: datetime):
+        claimable = (
+            select(self.model.id)
+            .where(self.model.status.in_(("PENDING", "SENDING")), self.model.next_attempt_at <= now)
+            .order_by(self.model.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        claim_stmt = (
+            update(self.model)
+            .where(self.model.id.in_(claimable))
+            .values(status="SENDING", attempts=self.model.attempts + 1, next_attempt_at=lease_until)
+            .returning(self.model)
+        )
+        result = await self.session.execute(claim_stmt)
+        models = sorted(result.scalars().all(), key=lambda model: model.id)
+        return [self.schema.model_validate(model) for model in models]
+
+    async def mark_sent(self, ids: list[int], now: datetime):
+        if not ids:
+            return
+        await self.session.execute(
+            update(self.model)
+            .where(self.model.id.in_(ids), self.model.status == "SENDING")
+            .values(status="SENT", sent_at=now, last_error=None)
+        )
+
+    async def mark_failed(self, message_id: int, error: str, next_attempt_at: datetime, final: bool):
+        await self.session.execute(
+            update(self.model)
+            .where(self.model.id == message_id, self.model.status == "SENDING")
+            .values(
+                status="FAILED" if final else "PENDING",
+                last_error=error[:1000],
+                next_attempt_at=next_attempt_at,
+            )
+        )
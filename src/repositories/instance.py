@@ -1,3 +1,5 @@
+from sqlalchemy import select
+
 from src.models.instance import InstanceORM
 from src.schemas.instance import Instance
 from src.repositories.base import BaseRepository
@@ -6,3 +8,15 @@ from src.repositories.base import BaseRepository
 class InstanceRepository(BaseRepository):
     model = InstanceORM
     schema = Instance
+
+    async def get_free_by_exchange_point(self, book_id: int) -> dict[int, list[int]]:
+        query = (
+            select(self.model.id, self.model.exchange_point_id)
+            .where(self.model.book_id == book_id, self.model.status == "FREE")
+            .order_by(self.model.id)
+        )
+        result = await self.session.execute(query)
+        instances = {}
+        for instance_id, exchange_point_id in result.all():
+            instances.setdefault(exchange_point_id, []).append(instance_id)
+        return instances
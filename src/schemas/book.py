@@ -1,6 +1,7 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, computed_field
 
 from src.schemas.author import Author
+from src.utils.images import image_variants
 
 
 class Book(BaseModel):
@@ -12,9 +13,15 @@ class Book(BaseModel):
     isbn: str | None
     description: str | None
     image: str | None
+    image_placeholder: str | None = None
     author: Author
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def image_variants(self) -> dict | None:
+        return image_variants(self.image)
+
 
 class BookAdd(BaseModel):
     author_id: int
@@ -24,3 +31,4 @@ class BookAdd(BaseModel):
     isbn: str | None = None
     description: str | None = None
     image: str | None = None
+    image_placeholder: str | None = None
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, ConfigDict
 
 from src.schemas.instance import Instance
@@ -7,6 +9,7 @@ class BookingAdd(BaseModel):
     user_id: int
     instance_id: int
     book_id: int
+    expires_at: datetime | None = None
 
 
 class Booking(BaseModel):
@@ -14,5 +17,6 @@ class Booking(BaseModel):
     user_id: int
     instance_id: int
     book_id: int
+    expires_at: datetime | None = None
     instance: Instance
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class EmailOutboxAdd(BaseModel):
+    to_email: str
+    subject: str
+    body: str
+    next_attempt_at: datetime
+    created_at: datetime
+
+
+class EmailOutbox(BaseModel):
+    id: int
+    to_email: str
+    subject: str
+    body: str
+    status: str
+    attempts: int
+    last_error: str | None
+    next_attempt_at: datetime
+    created_at: datetime
+    sent_at: datetime | None
+    model_config = ConfigDict(from_attributes=True)
@@ -8,5 +8,7 @@ class ExchangePoint(BaseModel):
     organisation_id: int
     address: str
     description: str | None
+    latitude: float | None = None
+    longitude: float | None = None
     organisation: Organisation | None = None
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,71 @@
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+from src.config import settings
+from src.utils.assets import static_assets
+
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+
+
+def cgroup_cpu_limit() -> int | None:
+    try:
+        quota, period = CGROUP_CPU_MAX.read_text().split()
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return max(1, int(quota) // int(period))
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    return min(cpus, limit) if limit else cpus
+
+
+def worker_count() -> int:
+    if settings.SERVER_RELOAD:
+        return 1
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+    return available_cpus()
+
+
+def prepare_metrics_dir() -> None:
+    if not settings.METRICS_ENABLED:
+        return
+    path = Path(settings.PROMETHEUS_MULTIPROC_DIR or tempfile.mkdtemp(prefix="prometheus-"))
+    path.mkdir(parents=True, exist_ok=True)
+    for stale in path.glob("*.db"):
+        stale.unlink()
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(path)
+
+
+def main():
+    static_assets.ensure_built()
+    prepare_metrics_dir()
+    uvicorn.run(
+        "src.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=worker_count(),
+        reload=settings.SERVER_RELOAD,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        limit_max_requests=settings.SERVER_MAX_REQUESTS,
+        access_log=settings.SERVER_ACCESS_LOG,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
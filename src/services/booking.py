@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from fastapi_cache import FastAPICache
+
+from src.config import settings
+from src.database import async_session
+from src.init import redis_manager
+from src.utils.db_manager import DBManager
+
+logger = logging.getLogger(__name__)
+
+SWEEPER_LOCK_KEY = "booking_sweeper:lock"
+
+
+class BookingService:
+    def hold_expires_at(self) -> datetime | None:
+        if settings.BOOKING_HOLD_HOURS <= 0:
+            return None
+        return datetime.now(timezone.utc) + timedelta(hours=settings.BOOKING_HOLD_HOURS)
+
+    async def release_expired(self) -> int:
+        released = 0
+        batch_size = settings.BOOKING_SWEEP_BATCH_SIZE
+        while True:
+            async with DBManager(session_factory=async_session) as db:
+                deleted = await db.booking.release_expired(datetime.now(timezone.utc), batch_size)
+                await db.commit()
+            released += deleted
+            if deleted < batch_size:
+                break
+        if released:
+            await FastAPICache.clear(namespace="book")
+        return released
+
+    async def run_sweeper(self):
+        interval = settings.BOOKING_SWEEP_INTERVAL_SECONDS
+        while True:
+            try:
+                async with redis_manager.lock(SWEEPER_LOCK_KEY, expire=interval) as acquired:
+                    if acquired:
+                        released = await self.release_expired()
+                        if released:
+                            logger.info("Released %s expired bookings", released)
+            except Exception:
+                logger.exception("Booking sweeper failed")
+            await asyncio.sleep(interval)
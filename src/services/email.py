@@ -1,10 +1,22 @@
+import asyncio
+import logging
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from email.message import EmailMessage
 
 from src.config import settings
+from src.database import async_session
+from src.schemas.email_outbox import EmailOutboxAdd
+from src.utils.db_manager import DBManager
+
+logger = logging.getLogger(__name__)
 
 
 class EmailService:
+    def __init__(self):
+        self.server = None
+
     def _build_message(self, to_email: str, subject: str, body: str) -> EmailMessage:
         from_email = settings.SMTP_FROM or settings.SMTP_USER
         if not from_email:
@@ -17,21 +29,126 @@ class EmailService:
         msg.set_content(body)
         return msg
 
-    def send_email(self, to_email: str, subject: str, body: str) -> None:
+    def _connect(self) -> smtplib.SMTP:
         if not settings.SMTP_HOST:
             raise RuntimeError("SMTP_HOST is not configured")
 
-        msg = self._build_message(to_email, subject, body)
         if settings.SMTP_SSL:
-            with smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT, timeout=20) as server:
-                if settings.SMTP_USER and settings.SMTP_PASS:
-                    server.login(settings.SMTP_USER, settings.SMTP_PASS)
-                server.send_message(msg)
-            return
-
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=20) as server:
+            server = smtplib.SMTP_SSL(
+                settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS
+            )
+        else:
+            server = smtplib.SMTP(
+                settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS
+            )
             if settings.SMTP_STARTTLS:
                 server.starttls()
-            if settings.SMTP_USER and settings.SMTP_PASS:
-                server.login(settings.SMTP_USER, settings.SMTP_PASS)
+        if settings.SMTP_USER and settings.SMTP_PASS:
+            server.login(settings.SMTP_USER, settings.SMTP_PASS)
+        return server
+
+    def _send_reusing_connection(self, msg: EmailMessage) -> None:
+        if self.server is None:
+            self.server = self._connect()
+        try:
+            self.server.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.close()
+            self.server = self._connect()
+            self.server.send_message(msg)
+
+    def send_email(self, to_email: str, subject: str, body: str) -> None:
+        msg = self._build_message(to_email, subject, body)
+        with self._connect() as server:
             server.send_message(msg)
+
+    def send_batch(self, messages: list) -> list[str | None]:
+        errors = []
+        for message in messages:
+            try:
+                msg = self._build_message(message.to_email, message.subject, message.body)
+                self._send_reusing_connection(msg)
+                errors.append(None)
+            except Exception as exc:
+                errors.append(str(exc) or exc.__class__.__name__)
+        return errors
+
+    def close(self) -> None:
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            pass
+        self.server = None
+
+
+class EmailOutboxService:
+    def __init__(self, session_factory=async_session):
+        self.session_factory = session_factory
+        self.sender = EmailService()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+
+    async def enqueue(self, db: DBManager, to_email: str, subject: str, body: str) -> None:
+        now = datetime.now(timezone.utc)
+        await db.email_outbox.add(
+            EmailOutboxAdd(
+                to_email=to_email,
+                subject=subject,
+                body=body,
+                next_attempt_at=now,
+                created_at=now,
+            )
+        )
+
+    def retry_delay(self, attempts: int) -> timedelta:
+        return timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+    async def claim(self) -> list:
+        now = datetime.now(timezone.utc)
+        lease_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+        async with DBManager(session_factory=self.session_factory) as db:
+            messages = await db.email_outbox.claim_batch(now, settings.EMAIL_OUTBOX_BATCH_SIZE, lease_until)
+            await db.commit()
+        return messages
+
+    async def record(self, messages: list, errors: list[str | None]) -> None:
+        now = datetime.now(timezone.utc)
+        async with DBManager(session_factory=self.session_factory) as db:
+            sent_ids = []
+            for message, error in zip(messages, errors):
+                if error is None:
+                    sent_ids.append(message.id)
+                    continue
+                await db.email_outbox.mark_failed(
+                    message.id,
+                    error=error,
+                    next_attempt_at=now + self.retry_delay(message.attempts),
+                    final=message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+                )
+                logger.warning("Email %s delivery failed (attempt %s): %s", message.id, message.attempts, error)
+            await db.email_outbox.mark_sent(sent_ids, now)
+            await db.commit()
+
+    async def deliver_pending(self) -> int:
+        messages = await self.claim()
+        if not messages:
+            return 0
+        loop = asyncio.get_running_loop()
+        errors = await loop.run_in_executor(self.executor, self.sender.send_batch, messages)
+        await self.record(messages, errors)
+        return len(messages)
+
+    async def run_worker(self):
+        try:
+            while True:
+                try:
+                    delivered = await self.deliver_pending()
+                except Exception:
+                    logger.exception("Email outbox worker failed")
+                    delivered = 0
+                if delivered < settings.EMAIL_OUTBOX_BATCH_SIZE:
+                    await asyncio.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
+        finally:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self.sender.close)
+            self.executor.shutdown(wait=False)
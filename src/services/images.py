@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile
+
+from src.config import settings
+
+IMAGES_DIR = Path(__file__).resolve().parents[1] / "imgs"
+ALLOWED_IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif"}
+SUFFIX_ALIASES = {".jpeg": ".jpg"}
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+CHUNK_SIZE = 1024 * 1024
+HASHED_IMAGE_NAME_RE = re.compile(r"[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.[a-z]+")
+
+
+def is_hashed_image_name(name: str) -> bool:
+    return HASHED_IMAGE_NAME_RE.fullmatch(name) is not None
+
+
+def sniff_suffix(head: bytes) -> str | None:
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:12] in (b"ftypavif", b"ftypavis"):
+        return ".avif"
+    return None
+
+
+def check_upload_size(content_length: str | None) -> None:
+    if content_length is None:
+        raise HTTPException(status_code=411, detail="Не указан размер запроса")
+    try:
+        size = int(content_length)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Некорректный размер запроса")
+    if size > settings.IMAGE_MAX_UPLOAD_BYTES + UPLOAD_FORM_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail="Файл слишком большой")
+
+
+class ImageTooLarge(Exception):
+    pass
+
+
+class ImageStorageService:
+    def __init__(self, images_dir: Path = IMAGES_DIR):
+        self.images_dir = images_dir
+
+    def image_name(self, digest: str, suffix: str) -> str:
+        return f"{digest[:2]}/{digest[2:4]}/{digest}{suffix}"
+
+    def _store(self, source, suffix: str) -> str:
+        tmp_dir = self.images_dir / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                chunk = source.read(CHUNK_SIZE)
+                suffix = sniff_suffix(chunk) or suffix
+                while chunk:
+                    size += len(chunk)
+                    if size > settings.IMAGE_MAX_UPLOAD_BYTES:
+                        raise ImageTooLarge()
+                    digest.update(chunk)
+                    tmp_file.write(chunk)
+                    chunk = source.read(CHUNK_SIZE)
+            name = self.image_name(digest.hexdigest(), suffix)
+            target = self.images_dir / name
+            if target.exists():
+                os.unlink(tmp_name)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.chmod(tmp_name, 0o644)
+                os.replace(tmp_name, target)
+            return name
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    async def save_upload(self, upload: UploadFile) -> str:
+        suffix = Path(upload.filename or "").suffix.lower() or ".jpg"
+        if suffix not in ALLOWED_IMAGE_SUFFIXES:
+            raise HTTPException(status_code=400, detail="Неподдерживаемый формат изображения")
+        suffix = SUFFIX_ALIASES.get(suffix, suffix)
+        await upload.seek(0)
+        try:
+            return await asyncio.to_thread(self._store, upload.file, suffix)
+        except ImageTooLarge:
+            raise HTTPException(status_code=413, detail="Файл слишком большой")
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select
+
+from src.config import settings
+from src.database import read_only_session
+from src.init import redis_manager
+from src.models.exchange_point import ExchangePointORM
+from src.models.organisation import OrganisationORM
+from src.utils.cache import render_json
+from src.utils.db_manager import DBManager
+from src.utils.pages import CachedPage
+from src.utils.spatial import KDTree
+from src.utils.text_search import TextIndex
+
+logger = logging.getLogger(__name__)
+
+SHELVES_VERSION_KEY = "shelves:version"
+
+
+class ShelfSnapshot:
+    def __init__(self, shelves: list[dict], version: int | None):
+        self.version = version
+        self.items = shelves
+        self.shelves = {shelf["id"]: shelf for shelf in shelves}
+        self.text_index = TextIndex((shelf["id"], f"{shelf['name']} {shelf['address']}") for shelf in shelves)
+        self.directory = CachedPage.build(render_json({"items": shelves}).decode("utf-8"), mtime_ns=0)
+        self.tree = KDTree(
+            (shelf["id"], shelf["latitude"], shelf["longitude"])
+            for shelf in shelves
+            if shelf["latitude"] is not None and shelf["longitude"] is not None
+        )
+
+    def select(self, shelf_ids) -> list[dict]:
+        return sorted(
+            (self.shelves[shelf_id] for shelf_id in set(shelf_ids) if shelf_id in self.shelves),
+            key=lambda shelf: self.text_index.order[shelf["id"]],
+        )
+
+    def search(self, query: str | None) -> list[dict]:
+        return [self.shelves[shelf_id] for shelf_id in self.text_index.search(query)]
+
+    def suggest(self, query: str | None, limit: int) -> list[dict]:
+        return [self.shelves[shelf_id] for shelf_id in self.text_index.suggest(query, limit)]
+
+    def nearest(self, lat: float, lon: float, limit: int) -> list[tuple[dict, float]]:
+        return [(self.shelves[shelf_id], distance) for shelf_id, distance in self.tree.nearest(lat, lon, limit)]
+
+
+class ShelfIndex:
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self.snapshot = None
+        self.checked_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def is_fresh(self) -> bool:
+        return self.snapshot is not None and time.monotonic() - self.checked_at < self.check_interval
+
+    async def remote_version(self) -> int | None:
+        try:
+            return int(await redis_manager.get(SHELVES_VERSION_KEY) or 0)
+        except Exception:
+            return None
+
+    async def load(self, version: int | None) -> ShelfSnapshot:
+        query = (
+            select(ExchangePointORM, OrganisationORM)
+            .join(OrganisationORM, OrganisationORM.id == ExchangePointORM.organisation_id)
+            .order_by(OrganisationORM.name.asc(), ExchangePointORM.address.asc())
+        )
+        async with DBManager(session_factory=read_only_session, read_only=True) as db:
+            rows = (await db.session.execute(query)).all()
+        shelves = [
+            {
+                "id": point.id,
+                "name": organisation.name,
+                "address": point.address,
+                "description": point.description or organisation.description,
+                "latitude": point.latitude,
+                "longitude": point.longitude,
+            }
+            for point, organisation in rows
+        ]
+        return ShelfSnapshot(shelves, version)
+
+    async def get(self) -> ShelfSnapshot:
+        if self.is_fresh():
+            return self.snapshot
+        async with self.lock:
+            if self.is_fresh():
+                return self.snapshot
+            version = await self.remote_version()
+            if self.snapshot is None or version is None or version != self.snapshot.version:
+                self.snapshot = await self.load(version)
+            self.checked_at = time.monotonic()
+        return self.snapshot
+
+    async def invalidate(self) -> None:
+        try:
+            await redis_manager.incr(SHELVES_VERSION_KEY)
+        except Exception:
+            logger.warning("Could not publish the shelf index version")
+        self.snapshot = None
+
+
+shelf_index = ShelfIndex(check_interval=settings.SHELVES_VERSION_CHECK_SECONDS)
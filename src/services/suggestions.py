@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import time
+from itertools import islice
+
+from sqlalchemy import select
+
+from src.config import settings
+from src.database import read_only_session
+from src.init import redis_manager
+from src.models.author import AuthorORM
+from src.models.book import BookORM
+from src.utils.db_manager import DBManager
+from src.utils.text_search import PrefixArray, normalize
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_VERSION_KEY = "book_suggest:version"
+SUGGEST_CHANGES_KEY = "book_suggest:changes"
+SUGGEST_KINDS = ("book", "author")
+SUGGEST_COLUMNS = {"book": (BookORM.id, BookORM.title), "author": (AuthorORM.id, AuthorORM.fullname)}
+
+PUBLISH_CHANGES_LUA = """
+local version = 0
+for i = 2, #ARGV do
+    version = redis.call('INCR', KEYS[1])
+    redis.call('ZADD', KEYS[2], version, ARGV[i])
+end
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[1]) - 1)
+return version
+"""
+
+
+def to_ref(kind: str, row_id: int) -> int:
+    return row_id << 1 | SUGGEST_KINDS.index(kind)
+
+
+def from_ref(ref: int) -> tuple[str, int]:
+    return SUGGEST_KINDS[ref & 1], ref >> 1
+
+
+def word_keys(normalized: str) -> set[str]:
+    return set(normalized.split()[1:])
+
+
+class BookSuggestIndex:
+    def __init__(self, check_interval: float, changes_limit: int, scan_limit: int):
+        self.check_interval = check_interval
+        self.changes_limit = changes_limit
+        self.scan_limit = scan_limit
+        self.texts: dict[int, tuple[str, str]] = {}
+        self.heads = PrefixArray()
+        self.words = PrefixArray()
+        self.version = None
+        self.checked_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def is_fresh(self) -> bool:
+        return self.version is not None and time.monotonic() - self.checked_at < self.check_interval
+
+    def put(self, ref: int, text: str) -> None:
+        self.discard(ref)
+        normalized = normalize(text)
+        if not normalized:
+            return
+        self.texts[ref] = (text, normalized)
+        self.heads.insert(normalized, ref)
+        for word in word_keys(normalized):
+            self.words.insert(word, ref)
+
+    def discard(self, ref: int) -> None:
+        entry = self.texts.pop(ref, None)
+        if entry is None:
+            return
+        normalized = entry[1]
+        self.heads.remove(normalized, ref)
+        for word in word_keys(normalized):
+            self.words.remove(word, ref)
+
+    async def fetch(self, refs=None) -> dict[int, str]:
+        rows = {}
+        async with DBManager(session_factory=read_only_session, read_only=True) as db:
+            for kind, (id_column, text_column) in SUGGEST_COLUMNS.items():
+                query = select(id_column, text_column)
+                if refs is not None:
+                    ids = [row_id for ref_kind, row_id in map(from_ref, refs) if ref_kind == kind]
+                    if not ids:
+                        continue
+                    query = query.where(id_column.in_(ids))
+                for row_id, text in (await db.session.execute(query)).all():
+                    rows[to_ref(kind, row_id)] = text
+        return rows
+
+    @staticmethod
+    def compile(rows: dict[int, str]) -> tuple[dict, PrefixArray, PrefixArray]:
+        texts = {}
+        heads = []
+        words = []
+        for ref, text in rows.items():
+            normalized = normalize(text)
+            if not normalized:
+                continue
+            texts[ref] = (text, normalized)
+            heads.append((normalized, ref))
+            words.extend((word, ref) for word in word_keys(normalized))
+        return texts, PrefixArray(heads), PrefixArray(words)
+
+    async def build(self, version: int) -> None:
+        rows = await self.fetch()
+        self.texts, self.heads, self.words = await asyncio.to_thread(self.compile, rows)
+        self.version = version
+        logger.info("Book suggestion index built: %s entries", len(self.texts))
+
+    async def refresh(self, refs: set[int]) -> None:
+        rows = await self.fetch(refs)
+        for ref in refs:
+            if ref in rows:
+                self.put(ref, rows[ref])
+            else:
+                self.discard(ref)
+
+    async def remote_changes(self) -> tuple[int, set[int]]:
+        async with redis_manager.pipeline(transaction=True) as pipe:
+            pipe.get(SUGGEST_VERSION_KEY)
+            pipe.zrangebyscore(SUGGEST_CHANGES_KEY, f"({self.version or 0}", "+inf")
+            version, members = await pipe.execute()
+        return int(version or 0), {int(member) for member in members}
+
+    async def sync(self) -> None:
+        try:
+            version, refs = await self.remote_changes()
+        except Exception:
+            if self.version is None:
+                await self.build(0)
+            return
+        if self.version is None or version < self.version or version - self.version > self.changes_limit:
+            await self.build(version)
+        elif version > self.version:
+            await self.refresh(refs)
+            self.version = version
+
+    async def get(self) -> "BookSuggestIndex":
+        if self.is_fresh():
+            return self
+        async with self.lock:
+            if not self.is_fresh():
+                await self.sync()
+                self.checked_at = time.monotonic()
+        return self
+
+    async def warm_up(self) -> None:
+        try:
+            await self.get()
+        except Exception:
+            logger.exception("Book suggestion index build failed, it will be built on demand")
+
+    async def publish(self, *changes: tuple[str, int]) -> None:
+        refs = {to_ref(kind, row_id) for kind, row_id in changes}
+        if self.version is not None:
+            async with self.lock:
+                await self.refresh(refs)
+        try:
+            if "book_suggest_publish" not in redis_manager.scripts:
+                redis_manager.register_script("book_suggest_publish", PUBLISH_CHANGES_LUA)
+            await redis_manager.run_script(
+                "book_suggest_publish",
+                keys=[SUGGEST_VERSION_KEY, SUGGEST_CHANGES_KEY],
+                args=[self.changes_limit, *refs],
+            )
+        except Exception:
+            logger.warning("Could not publish book suggestion changes")
+
+    def matches(self, normalized: str):
+        yield from self.heads.scan(normalized)
+        first, _, rest = normalized.partition(" ")
+        if not rest:
+            yield from self.words.scan(first)
+            return
+        phrase = f" {normalized}"
+        for ref in islice(self.words.scan(first), self.scan_limit):
+            if phrase in f" {self.texts[ref][1]}":
+                yield ref
+
+    def suggest(self, query: str | None, limit: int) -> list[dict]:
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        items = []
+        seen = set()
+        for ref in self.matches(normalized):
+            kind, row_id = from_ref(ref)
+            text, text_normalized = self.texts[ref]
+            if (kind, text_normalized) in seen:
+                continue
+            seen.add((kind, text_normalized))
+            items.append({"type": kind, "id": row_id, "text": text})
+            if len(items) == limit:
+                break
+        return items
+
+
+book_suggest_index = BookSuggestIndex(
+    check_interval=settings.BOOK_SUGGEST_CHECK_SECONDS,
+    changes_limit=settings.BOOK_SUGGEST_CHANGES_LIMIT,
+    scan_limit=settings.BOOK_SUGGEST_SCAN_LIMIT,
+)
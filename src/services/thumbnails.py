@@ -0,0 +1,115 @@
+import asyncio
+import base64
+import importlib.util
+import io
+import os
+import tempfile
+from pathlib import Path
+
+from src.config import settings
+from src.services.images import IMAGES_DIR
+from src.utils.images import THUMBNAIL_FORMATS
+
+PILLOW_INSTALLED = importlib.util.find_spec("PIL") is not None
+
+THUMBS_DIR = IMAGES_DIR / ".thumbs"
+PLACEHOLDER_WIDTH = 16
+
+
+def open_cover(source: Path):
+    from PIL import Image, ImageOps
+
+    image = Image.open(source)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    return image
+
+
+def render_thumbnail(source: str, target: str, width: int, fmt: str) -> str:
+    from PIL import Image
+
+    pil_format, options = THUMBNAIL_FORMATS[fmt]
+    with open_cover(Path(source)) as image:
+        image.thumbnail((width, width * 2), Image.Resampling.LANCZOS)
+        target_path = Path(target)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=target_path.parent)
+        with os.fdopen(fd, "wb") as tmp_file:
+            image.save(tmp_file, pil_format, **options)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, target_path)
+    return target
+
+
+def render_placeholder(source: str) -> str:
+    from PIL import Image
+
+    with open_cover(Path(source)) as image:
+        image.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH * 2), Image.Resampling.BILINEAR)
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=30)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+class ThumbnailService:
+    executor = None
+
+    @classmethod
+    def get_executor(cls):
+        if cls.executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            cls.executor = ProcessPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS)
+        return cls.executor
+
+    @classmethod
+    def shutdown(cls):
+        if cls.executor is not None:
+            cls.executor.shutdown(wait=False, cancel_futures=True)
+            cls.executor = None
+
+    @property
+    def enabled(self) -> bool:
+        return PILLOW_INSTALLED
+
+    def source_path(self, image: str) -> Path | None:
+        if any(part.startswith(".") for part in Path(image).parts):
+            return None
+        source = (IMAGES_DIR / image).resolve()
+        if IMAGES_DIR.resolve() not in source.parents or not source.is_file():
+            return None
+        return source
+
+    def target_path(self, image: str, width: int, fmt: str) -> Path:
+        return THUMBS_DIR / str(width) / f"{image}.{fmt}"
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.get_executor(), func, *args)
+
+    async def get_thumbnail(self, image: str, width: int, fmt: str) -> Path | None:
+        source = self.source_path(image)
+        if source is None:
+            return None
+        target = self.target_path(image, width, fmt)
+        if target.is_file():
+            return target
+        if not self.enabled:
+            return None
+        await self.run(render_thumbnail, str(source), str(target), width, fmt)
+        return target
+
+    async def warm_up(self, image: str) -> None:
+        for width in settings.THUMBNAIL_WIDTHS:
+            for fmt in THUMBNAIL_FORMATS:
+                await self.get_thumbnail(image, width, fmt)
+
+    async def placeholder(self, image: str) -> str | None:
+        source = self.source_path(image)
+        if source is None or not self.enabled:
+            return None
+        try:
+            return await self.run(render_placeholder, str(source))
+        except Exception:
+            return None
@@ -1,21 +1,64 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import cache
 
 import jwt
 from fastapi import HTTPException, Response
-from passlib.context import CryptContext
 from pydantic import BaseModel
 
 from src.config import settings
+from src.init import redis_manager
+from src.schemas.user import User
 
 
-class AuthService:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+password_jobs = 0
+
+
+async def run_password_job(func, *args):
+    global password_jobs
+    if password_jobs >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+        raise HTTPException(
+            status_code=503,
+            detail="Сервер перегружен, попробуйте позже",
+            headers={"Retry-After": "1"},
+        )
+    password_jobs += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, func, *args)
+    finally:
+        password_jobs -= 1
+
+
+@cache
+def password_context():
+    from passlib.context import CryptContext
 
-    def hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    )
 
-    def verify_password(self, password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(password, hashed_password)
+
+def hash_password_sync(password: str) -> str:
+    return password_context().hash(password)
+
+
+def verify_password_sync(password: str, hashed_password: str) -> bool:
+    return password_context().verify(password, hashed_password)
+
+
+class AuthService:
+    async def hash_password(self, password: str) -> str:
+        return await run_password_job(hash_password_sync, password)
+
+    async def verify_password(self, password: str, hashed_password: str) -> bool:
+        return await run_password_job(verify_password_sync, password, hashed_password)
 
     def create_access_token(self, data: dict):
         to_encode = data.copy()
@@ -50,3 +93,35 @@ class AuthService:
         )
         response.set_cookie("access_token", access_token)
         return access_token
+
+
+class UserCacheService:
+    key_prefix = "user_cache"
+
+    def key(self, user_id: int) -> str:
+        return f"{self.key_prefix}:{user_id}"
+
+    async def get(self, user_id: int) -> User | None:
+        try:
+            cached = await redis_manager.get(self.key(user_id))
+        except Exception:
+            return None
+        if cached is None:
+            return None
+        return User.model_validate_json(cached)
+
+    async def set(self, user: User) -> None:
+        try:
+            await redis_manager.set(
+                self.key(user.id),
+                user.model_dump_json(),
+                expire=settings.USER_CACHE_TTL_SECONDS,
+            )
+        except Exception:
+            pass
+
+    async def invalidate(self, user_id: int) -> None:
+        try:
+            await redis_manager.delete(self.key(user_id))
+        except Exception:
+            pass
@@ -101,6 +101,89 @@
     });
   }
 
+  function buildSrcset(urls) {
+    return Object.entries(urls || {}).map(([width, url]) => `${url} ${width}w`).join(", ");
+  }
+
+  window.bookCoverPicture = function (book, options) {
+    const variants = book?.image_variants;
+    const styles = [options.style || ""];
+    if (book?.image_placeholder) {
+      styles.push(`background-image: url('${book.image_placeholder}'); background-size: cover;`);
+    }
+    const fallback = variants
+      ? "this.parentElement.querySelectorAll('source').forEach((source) => source.remove());this.removeAttribute('srcset');"
+      : "";
+    const onerror = options.onerror ? ` onerror="${fallback}${options.onerror}"` : "";
+    const imgAttrs = `src="${options.src}" class="${options.className}" alt="${options.alt}" style="${styles.join(" ").trim()}"${onerror}`;
+    if (!variants) {
+      return `<img ${imgAttrs}>`;
+    }
+    return `
+      <picture class="book-cover-picture">
+        <source type="image/webp" srcset="${buildSrcset(variants.webp)}" sizes="${options.sizes}">
+        <img ${imgAttrs} srcset="${buildSrcset(variants.jpg)}" sizes="${options.sizes}" loading="lazy" decoding="async">
+      </picture>
+    `;
+  };
+
+  window.readSsrData = function () {
+    const node = document.getElementById("ssr-data");
+    return node ? JSON.parse(node.textContent) : null;
+  };
+
+  let shelfDirectory = null;
+
+  window.loadShelfDirectory = function () {
+    if (!shelfDirectory) {
+      shelfDirectory = fetch("/main/shelves/directory", {headers: {"Accept": "application/json"}})
+        .then((response) => (response.ok ? response.json() : {items: []}))
+        .then((data) => (Array.isArray(data.items) ? data.items : []))
+        .catch(() => {
+          shelfDirectory = null;
+          return [];
+        });
+    }
+    return shelfDirectory;
+  };
+
+  window.mountSuggestions = function (input, list, url, describe) {
+    let timer;
+
+    async function load() {
+      const q = input.value.trim();
+      if (!q) {
+        list.innerHTML = "";
+        return;
+      }
+      try {
+        const params = new URLSearchParams({q, limit: "8"});
+        const response = await fetch(`${url}?${params.toString()}`, {
+          headers: {"Accept": "application/json"}
+        });
+        if (!response.ok) {
+          return;
+        }
+        const data = await response.json();
+        list.innerHTML = "";
+        (data.items ?? []).forEach((item) => {
+          const {value, label} = describe(item);
+          const option = document.createElement("option");
+          option.value = value ?? "";
+          option.label = label ?? "";
+          list.appendChild(option);
+        });
+      } catch (error) {
+        list.innerHTML = "";
+      }
+    }
+
+    input.addEventListener("input", () => {
+      clearTimeout(timer);
+      timer = setTimeout(load, 150);
+    });
+  };
+
   document.documentElement.setAttribute("data-theme", getInitialTheme());
 
   if (document.readyState === "loading") {
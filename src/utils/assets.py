@@ -0,0 +1,196 @@
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import HTMLResponse
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parents[1] / "static"
+STATIC_BUILD_DIR = Path(__file__).resolve().parents[1] / "static_build"
+MANIFEST_NAME = "manifest.json"
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".json", ".txt", ".html"}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+STATIC_URL_RE = re.compile(r'(?P<attr>href|src)="/static/(?P<name>[^"?#]+)"')
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    encodings = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name and quality > 0:
+            encodings.add(name)
+    return encodings
+
+
+def write_atomic(target: Path, payload: bytes) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent)
+    with os.fdopen(fd, "wb") as tmp_file:
+        tmp_file.write(payload)
+    os.chmod(tmp_name, 0o644)
+    os.replace(tmp_name, target)
+
+
+class StaticAssets:
+    def __init__(self, source_dir: Path = STATIC_DIR, build_dir: Path = STATIC_BUILD_DIR):
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        self.manifest: dict[str, str] = {}
+
+    def fingerprint(self, name: str, payload: bytes) -> str:
+        digest = hashlib.sha256(payload).hexdigest()[:12]
+        path = Path(name)
+        return str(path.with_name(f"{path.stem}.{digest}{path.suffix}"))
+
+    def compress_variants(self, target: Path, payload: bytes) -> None:
+        if target.suffix not in COMPRESSIBLE_SUFFIXES:
+            return
+        variants = {".gz": gzip.compress(payload, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(payload, quality=11)
+        for suffix, compressed in variants.items():
+            variant = target.with_name(target.name + suffix)
+            if len(compressed) < len(payload) and not variant.exists():
+                write_atomic(variant, compressed)
+
+    def build(self) -> dict[str, str]:
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {}
+        for source in sorted(self.source_dir.rglob("*")):
+            if not source.is_file():
+                continue
+            name = source.relative_to(self.source_dir).as_posix()
+            payload = source.read_bytes()
+            hashed_name = self.fingerprint(name, payload)
+            for target_name in (name, hashed_name):
+                target = self.build_dir / target_name
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if target_name == name or not target.exists():
+                    write_atomic(target, payload)
+                if target_name == name:
+                    for suffix in ENCODING_SUFFIXES.values():
+                        target.with_name(target.name + suffix).unlink(missing_ok=True)
+                self.compress_variants(target, payload)
+            manifest[name] = hashed_name
+        write_atomic(
+            self.build_dir / MANIFEST_NAME,
+            json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"),
+        )
+        self.manifest = manifest
+        logger.info("Built %s static assets (brotli: %s)", len(manifest), brotli is not None)
+        return manifest
+
+    def load(self) -> dict[str, str]:
+        manifest_path = self.build_dir / MANIFEST_NAME
+        if manifest_path.is_file():
+            self.manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        return self.manifest
+
+    def is_current(self) -> bool:
+        try:
+            built_at = (self.build_dir / MANIFEST_NAME).stat().st_mtime_ns
+        except OSError:
+            return False
+        return all(
+            source.stat().st_mtime_ns <= built_at
+            for source in self.source_dir.rglob("*")
+            if source.is_file()
+        )
+
+    def ensure_built(self) -> dict[str, str]:
+        if self.is_current():
+            return self.load()
+        return self.build()
+
+    def is_fingerprinted(self, name: str) -> bool:
+        return name in self.manifest.values()
+
+    def url(self, name: str) -> str:
+        return f"/static/{self.manifest.get(name, name)}"
+
+    def rewrite_html(self, html: str) -> str:
+        if not self.manifest:
+            return html
+        return STATIC_URL_RE.sub(
+            lambda match: f'{match["attr"]}="{self.url(match["name"])}"',
+            html,
+        )
+
+
+static_assets = StaticAssets()
+
+
+def page_response(path: Path, status_code: int = 200) -> HTMLResponse:
+    html = path.read_text(encoding="utf-8")
+    return HTMLResponse(content=static_assets.rewrite_html(html), status_code=status_code)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    def __init__(self, *args, assets: StaticAssets = static_assets, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.assets = assets
+
+    def lookup_encoded(self, full_path: str, scope: Scope):
+        encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if encoding not in encodings:
+                continue
+            variant = full_path + suffix
+            try:
+                return encoding, variant, os.stat(variant)
+            except OSError:
+                continue
+        return None
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200):
+        full_path = os.fspath(full_path)
+        name = Path(full_path).relative_to(self.directory).as_posix()
+        compressible = Path(full_path).suffix in COMPRESSIBLE_SUFFIXES
+        encoded = self.lookup_encoded(full_path, scope) if compressible else None
+        if encoded is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+        else:
+            encoding, variant, variant_stat = encoded
+            response = super().file_response(variant, variant_stat, scope, status_code)
+            if response.status_code != 304:
+                media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+                if media_type.startswith("text/") or media_type == "application/javascript":
+                    media_type += "; charset=utf-8"
+                response.headers["Content-Type"] = media_type
+            response.headers["Content-Encoding"] = encoding
+        if compressible:
+            response.headers["Vary"] = "Accept-Encoding"
+        if self.assets.is_fingerprinted(name):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+        return response
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for source_name, built_name in StaticAssets().build().items():
+        print(f"{source_name} -> {built_name}")
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import logging
+import zlib
+from functools import wraps
+from inspect import Parameter, signature
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi_cache import FastAPICache
+from fastapi_cache.coder import Coder
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from src.config import settings
+from src.middlewares.auth_context import AuthContext
+from src.middlewares.rate_limit import limit_cache_miss
+from src.utils.db_manager import DBManager
+from src.utils.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def is_compressed(payload: bytes) -> bool:
+    return payload[:2] == GZIP_MAGIC
+
+
+def gzip_compress(payload: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(payload) + compressor.flush()
+
+
+def gzip_decompress(payload: bytes) -> bytes:
+    return zlib.decompress(payload, 31)
+
+
+def render_json(value: Any) -> bytes:
+    if isinstance(value, JSONResponse):
+        return value.body
+    return json.dumps(
+        jsonable_encoder(value),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class CompressedJsonCoder(Coder):
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        payload = render_json(value)
+        if len(payload) >= settings.CACHE_COMPRESS_MIN_SIZE:
+            return gzip_compress(payload, settings.CACHE_COMPRESS_LEVEL)
+        return payload
+
+    @classmethod
+    def decode(cls, value: bytes) -> Any:
+        if is_compressed(value):
+            value = gzip_decompress(value)
+        return json.loads(value)
+
+
+def request_key_builder(func, namespace: str, request: Request, kwargs: dict) -> str:
+    token = request.cookies.get("access_token") or ""
+    params = {
+        name: value
+        for name, value in kwargs.items()
+        if not isinstance(value, (DBManager, Request, AuthContext))
+    }
+    raw_key = f"{func.__module__}:{func.__name__}:{sorted(params.items())}:{token}"
+    return f"{namespace}:{hashlib.md5(raw_key.encode()).hexdigest()}"
+
+
+def accepts_gzip(request: Request) -> bool:
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+def cached_response(request: Request, payload: bytes, ttl: int, status: str) -> Response:
+    etag = f'W/"{zlib.crc32(payload):08x}{len(payload):x}"'
+    headers = {
+        "Cache-Control": f"max-age={max(ttl, 0)}",
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        FastAPICache.get_cache_status_header(): status,
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    if is_compressed(payload):
+        if accepts_gzip(request):
+            headers["Content-Encoding"] = "gzip"
+        else:
+            payload = gzip_decompress(payload)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+def uncacheable(request: Request) -> bool:
+    if not FastAPICache.get_enable():
+        return True
+    if request.method != "GET":
+        return True
+    return request.headers.get("Cache-Control") == "no-store"
+
+
+def cache(expire: int | None = None, namespace: str = ""):
+    def wrapper(func):
+        func_signature = signature(func)
+        request_name = next(
+            (
+                param.name
+                for param in func_signature.parameters.values()
+                if param.annotation is Request
+            ),
+            None,
+        )
+        injected = request_name is None
+        if injected:
+            request_name = "__cache_request"
+
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            request = kwargs.pop(request_name) if injected else kwargs[request_name]
+            if uncacheable(request):
+                await limit_cache_miss(request)
+                return await func(*args, **kwargs)
+
+            backend = FastAPICache.get_backend()
+            ttl_default = expire or FastAPICache.get_expire()
+            cache_key = request_key_builder(
+                func,
+                f"{FastAPICache.get_prefix()}:{namespace}",
+                request,
+                kwargs,
+            )
+            try:
+                ttl, cached = await backend.get_with_ttl(cache_key)
+            except Exception:
+                logger.warning("Error retrieving cache key '%s'", cache_key, exc_info=True)
+                ttl, cached = 0, None
+
+            if cached is not None and request.headers.get("Cache-Control") != "no-cache":
+                return cached_response(request, cached, ttl, "HIT")
+
+            await limit_cache_miss(request)
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response) and not isinstance(result, JSONResponse):
+                return result
+            with timed("serialize"):
+                payload = CompressedJsonCoder.encode(result)
+            try:
+                await backend.set(cache_key, payload, ttl_default)
+            except Exception:
+                logger.warning("Error setting cache key '%s'", cache_key, exc_info=True)
+            return cached_response(request, payload, ttl_default or 0, "MISS")
+
+        if injected:
+            inner.__signature__ = func_signature.replace(
+                parameters=[
+                    *func_signature.parameters.values(),
+                    Parameter(request_name, Parameter.KEYWORD_ONLY, annotation=Request),
+                ]
+            )
+        return inner
+
+    return wrapper
@@ -1,6 +1,7 @@
 from src.repositories.author import AuthorRepository
 from src.repositories.book import BookRepository
 from src.repositories.booking import BookingRepository
+from src.repositories.email_outbox import EmailOutboxRepository
 from src.repositories.exchange_point import ExchangePointRepository
 from src.repositories.instance import InstanceRepository
 from src.repositories.organisation import OrganisationRepository
@@ -8,27 +9,53 @@ from src.repositories.new_added_instance import NewAddedInstanceRepository
 from src.repositories.user import UserRepository
 
 
+class ReadOnlySessionError(RuntimeError):
+    pass
+
+
 class DBManager:
-    def __init__(self, session_factory):
+    repositories = {
+        "user": UserRepository,
+        "book": BookRepository,
+        "instance": InstanceRepository,
+        "author": AuthorRepository,
+        "exchange_point": ExchangePointRepository,
+        "organisation": OrganisationRepository,
+        "booking": BookingRepository,
+        "new_added_instance": NewAddedInstanceRepository,
+        "email_outbox": EmailOutboxRepository,
+    }
+
+    def __init__(self, session_factory, read_only: bool = False):
         self.session_factory = session_factory
+        self.read_only = read_only
+        self._session = None
 
-    async def __aenter__(self):
-        self.session = self.session_factory()
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = self.session_factory()
+        return self._session
 
-        self.user = UserRepository(self.session)
-        self.book = BookRepository(self.session)
-        self.instance = InstanceRepository(self.session)
-        self.author = AuthorRepository(self.session)
-        self.exchange_point = ExchangePointRepository(self.session)
-        self.organisation = OrganisationRepository(self.session)
-        self.booking = BookingRepository(self.session)
-        self.new_added_instance = NewAddedInstanceRepository(self.session)
+    def __getattr__(self, name):
+        repository_class = self.repositories.get(name)
+        if repository_class is None:
+            raise AttributeError(name)
+        repository = repository_class(self.session)
+        setattr(self, name, repository)
+        return repository
 
+    async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.session.rollback()
-        await self.session.close()
+        if self._session is None:
+            return
+        if not self.read_only:
+            await self._session.rollback()
+        await self._session.close()
 
     async def commit(self):
+        if self.read_only:
+            raise ReadOnlySessionError("Cannot commit a read-only session")
         await self.session.commit()
@@ -0,0 +1,168 @@
+import time
+import uuid
+from contextvars import ContextVar
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.config import settings
+from src.utils.metrics import MetricsRegistry, metrics_registry
+
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+checkout_connect_seconds: ContextVar[float | None] = ContextVar("checkout_connect_seconds", default=None)
+
+
+class PoolMetrics:
+    def __init__(self, name: str = "primary", registry: MetricsRegistry = metrics_registry):
+        self.name = name
+        self.registry = registry
+        self.pool = None
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.connect_total = 0.0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def count(self, name: str) -> None:
+        setattr(self, name, getattr(self, name) + 1)
+        self.registry.pool_counters[name].labels(self.name).inc()
+
+    def update_gauges(self) -> None:
+        if self.pool is None:
+            return
+        values = {
+            "size": self.pool.size(),
+            "checked_out": self.pool.checkedout(),
+            "checked_in": self.pool.checkedin(),
+            "overflow": self.pool.overflow(),
+        }
+        for name, value in values.items():
+            self.registry.pool_gauges[name].labels(self.name).set(value)
+
+    def record_connect(self, seconds: float) -> None:
+        self.connect_total += seconds
+        self.registry.pool_connect_seconds.labels(self.name).inc(seconds)
+
+    def record_wait(self, seconds: float) -> None:
+        self.registry.pool_wait_seconds.labels(self.name).inc(seconds)
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        for index, bound in enumerate(WAIT_BUCKETS):
+            if seconds <= bound:
+                self.wait_buckets[index] += 1
+                return
+        self.wait_buckets[-1] += 1
+
+    def attach(self, engine) -> None:
+        sync_engine = engine.sync_engine
+        self.pool = sync_engine.pool
+
+        @event.listens_for(sync_engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.count("checkouts")
+            self.update_gauges()
+
+        @event.listens_for(sync_engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            self.checkins += 1
+            self.update_gauges()
+
+        @event.listens_for(sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            self.count("connects")
+
+        @event.listens_for(sync_engine, "close")
+        def on_close(dbapi_connection, connection_record):
+            self.count("closes")
+
+        @event.listens_for(sync_engine, "close_detached")
+        def on_close_detached(dbapi_connection):
+            self.count("closes")
+
+        @event.listens_for(sync_engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            self.count("invalidations")
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        waited = sum(self.wait_buckets)
+        return {
+            "size": pool.size() if pool is not None else None,
+            "checked_out": pool.checkedout() if pool is not None else None,
+            "checked_in": pool.checkedin() if pool is not None else None,
+            "overflow": pool.overflow() if pool is not None else None,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "closes": self.closes,
+            "invalidations": self.invalidations,
+            "connect_avg_ms": round(self.connect_total / self.connects * 1000, 3) if self.connects else 0.0,
+            "wait_avg_ms": round(self.wait_total / waited * 1000, 3) if waited else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "wait_buckets": {
+                **{f"le_{bound}": count for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)},
+                "le_inf": self.wait_buckets[-1],
+            },
+        }
+
+
+def instrumented_pool_class(metrics: PoolMetrics):
+    class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+        def _do_get(self):
+            if checkout_connect_seconds.get() is not None:
+                return super()._do_get()
+            token = checkout_connect_seconds.set(0.0)
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                metrics.count("timeouts")
+                raise
+            finally:
+                metrics.record_wait(time.perf_counter() - started - checkout_connect_seconds.get())
+                checkout_connect_seconds.reset(token)
+
+        def _create_connection(self):
+            started = time.perf_counter()
+            try:
+                return super()._create_connection()
+            finally:
+                elapsed = time.perf_counter() - started
+                metrics.record_connect(elapsed)
+                if checkout_connect_seconds.get() is not None:
+                    checkout_connect_seconds.set(checkout_connect_seconds.get() + elapsed)
+
+    return InstrumentedAsyncPool
+
+
+def pgbouncer_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+
+def engine_options(metrics: PoolMetrics) -> dict:
+    options = {
+        "poolclass": instrumented_pool_class(metrics),
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+    if settings.DATABASE_PGBOUNCER:
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": pgbouncer_statement_name,
+        }
+    else:
+        options["connect_args"] = {
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        }
+    return options
@@ -0,0 +1,19 @@
+from src.config import settings
+
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def thumbnail_url(image: str, width: int, fmt: str) -> str:
+    return f"/thumbs/{width}/{image}.{fmt}"
+
+
+def image_variants(image: str | None) -> dict | None:
+    if not image or image.startswith(("http://", "https://", "/")):
+        return None
+    return {
+        fmt: {str(width): thumbnail_url(image, width, fmt) for width in settings.THUMBNAIL_WIDTHS}
+        for fmt in THUMBNAIL_FORMATS
+    }
@@ -0,0 +1,194 @@
+import os
+import re
+import time
+from collections import Counter as StatementCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, disable_created_metrics, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from starlette.responses import JSONResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TIMING_KINDS = ("db", "redis", "serialize")
+POOL_GAUGES = ("size", "checked_out", "checked_in", "overflow")
+POOL_COUNTERS = ("checkouts", "timeouts", "connects", "closes", "invalidations")
+PLACEHOLDER = r"\$\d+(?:::\w+(?: (?:WITH|WITHOUT|TIME|ZONE|VARYING|PRECISION))*(?:\(\d+(?:, ?\d+)?\))?(?:\[\])*)?"
+PLACEHOLDER_LIST_RE = re.compile(rf"{PLACEHOLDER}(?:\s*,\s*{PLACEHOLDER})*")
+WHITESPACE_RE = re.compile(r"\s+")
+
+disable_created_metrics()
+
+
+def multiprocess_dir() -> str | None:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+
+def mark_process_dead(pid: int) -> None:
+    if multiprocess_dir():
+        multiprocess.mark_process_dead(pid)
+
+
+def statement_shape(statement: str) -> str:
+    return PLACEHOLDER_LIST_RE.sub("?", WHITESPACE_RE.sub(" ", statement).strip())
+
+
+class RequestTimings:
+    def __init__(self, parent: "RequestTimings | None" = None):
+        self.parent = parent
+        self.durations = dict.fromkeys(TIMING_KINDS, 0.0)
+        self.counts = dict.fromkeys(TIMING_KINDS, 0)
+        self.statements = StatementCounter()
+
+    def add(self, kind: str, seconds: float) -> None:
+        self.durations[kind] += seconds
+        self.counts[kind] += 1
+        if self.parent is not None:
+            self.parent.add(kind, seconds)
+
+    def add_statement(self, shape: str, seconds: float) -> None:
+        self.statements[shape] += 1
+        self.durations["db"] += seconds
+        self.counts["db"] += 1
+        if self.parent is not None:
+            self.parent.add_statement(shape, seconds)
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def record_timing(kind: str, seconds: float) -> None:
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add(kind, seconds)
+
+
+def record_statement(statement: str, seconds: float) -> None:
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add_statement(statement_shape(statement), seconds)
+
+
+@contextmanager
+def timed(kind: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(kind, time.perf_counter() - started)
+
+
+def instrument_engine(engine) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        record_statement(statement, time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            started = connection.info["query_started"].pop()
+            record_timing("db", time.perf_counter() - started)
+
+
+class TimedJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        with timed("serialize"):
+            return super().render(content)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.registry = CollectorRegistry()
+        self.in_flight = Gauge(
+            "http_requests_in_flight",
+            "Requests currently being processed.",
+            registry=self.registry,
+            multiprocess_mode="livesum",
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds",
+            "Request latency by route template.",
+            ["method", "route"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.responses = Counter(
+            "http_responses",
+            "Responses by route template and status code.",
+            ["method", "route", "status"],
+            registry=self.registry,
+        )
+        self.timing_seconds = Counter(
+            "http_request_component_seconds",
+            "Time spent in DB, Redis and serialization.",
+            ["method", "route", "component"],
+            registry=self.registry,
+        )
+        self.timing_operations = Counter(
+            "http_request_component_operations",
+            "DB queries, Redis commands and serializations.",
+            ["method", "route", "component"],
+            registry=self.registry,
+        )
+        self.pool_gauges = {
+            name: Gauge(
+                f"db_pool_{name}",
+                f"Database pool {name.replace('_', ' ')} connections.",
+                ["pool"],
+                registry=self.registry,
+                multiprocess_mode="livesum",
+            )
+            for name in POOL_GAUGES
+        }
+        self.pool_counters = {
+            name: Counter(f"db_pool_{name}", f"Database pool {name}.", ["pool"], registry=self.registry)
+            for name in POOL_COUNTERS
+        }
+        self.pool_wait_seconds = Counter(
+            "db_pool_wait_seconds",
+            "Time spent waiting for a pooled connection, excluding connects.",
+            ["pool"],
+            registry=self.registry,
+        )
+        self.pool_connect_seconds = Counter(
+            "db_pool_connect_seconds",
+            "Time spent opening new database connections.",
+            ["pool"],
+            registry=self.registry,
+        )
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, timings: RequestTimings):
+        self.latency.labels(method, route).observe(seconds)
+        self.responses.labels(method, route, status).inc()
+        for kind in TIMING_KINDS:
+            self.timing_seconds.labels(method, route, kind).inc(timings.durations[kind])
+            self.timing_operations.labels(method, route, kind).inc(timings.counts[kind])
+
+    def render(self) -> str:
+        registry = self.registry
+        if multiprocess_dir():
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry).decode("utf-8")
+
+
+metrics_registry = MetricsRegistry()
+
+
+def server_timing_header(timings: RequestTimings, total: float) -> str:
+    parts = [
+        f'{kind};dur={timings.durations[kind] * 1000:.2f};desc="{timings.counts[kind]}"'
+        for kind in TIMING_KINDS
+        if timings.counts[kind]
+    ]
+    parts.append(f"app;dur={total * 1000:.2f}")
+    return ", ".join(parts)
@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import re
+from dataclasses import dataclass, field
+from html import escape
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from src.config import settings
+from src.utils.assets import accepted_encodings, brotli, static_assets
+
+TEMPLATES_DIR = Path(__file__).resolve().parents[1] / "templates"
+PAGE_CACHE_CONTROL = "no-cache"
+ERROR_PLACEHOLDER_RE = re.compile(r"__(STATUS_CODE|TITLE|DETAIL)__")
+SSR_SLOT_RE = re.compile(r"<!--ssr:(\w+)-->.*?<!--/ssr-->", re.S)
+
+
+@dataclass
+class PageVariant:
+    body: bytes
+    etag: str
+
+
+@dataclass
+class CachedPage:
+    mtime_ns: int
+    html: str
+    variants: dict[str, PageVariant] = field(default_factory=dict)
+    split_templates: dict[str, "SplitTemplate"] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, html: str, mtime_ns: int) -> "CachedPage":
+        body = html.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        page = cls(mtime_ns=mtime_ns, html=html)
+        page.variants["identity"] = PageVariant(body, f'"{digest}"')
+        compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed["br"] = brotli.compress(body, quality=11)
+        for encoding, payload in compressed.items():
+            if len(payload) < len(body):
+                page.variants[encoding] = PageVariant(payload, f'"{digest}-{encoding}"')
+        return page
+
+    def select(self, accept_encoding: str) -> tuple[str, PageVariant]:
+        encodings = accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in encodings and encoding in self.variants:
+                return encoding, self.variants[encoding]
+        return "identity", self.variants["identity"]
+
+
+class CachedPageResponse(Response):
+    media_type = "text/html"
+
+    def __init__(self, page: CachedPage, status_code: int = 200, media_type: str | None = None):
+        super().__init__(status_code=status_code, media_type=media_type)
+        self.page = page
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        encoding, variant = self.page.select(request_headers.get("accept-encoding", ""))
+        self.headers["ETag"] = variant.etag
+        self.headers["Cache-Control"] = PAGE_CACHE_CONTROL
+        self.headers["Vary"] = "Accept-Encoding"
+        if encoding != "identity":
+            self.headers["Content-Encoding"] = encoding
+
+        if_none_match = request_headers.get("if-none-match", "")
+        if self.status_code == 200 and if_none_match and (
+            if_none_match.strip() == "*"
+            or variant.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        ):
+            del self.headers["content-length"]
+            del self.headers["content-type"]
+            self.status_code = 304
+            self.body = b""
+        else:
+            self.body = variant.body
+            self.headers["Content-Length"] = str(len(variant.body))
+        await super().__call__(scope, receive, send)
+
+
+class PageCache:
+    def __init__(self, templates_dir: Path = TEMPLATES_DIR, reload: bool = False):
+        self.templates_dir = templates_dir
+        self.reload = reload
+        self.pages: dict[Path, CachedPage] = {}
+
+    def load(self, path: Path) -> CachedPage:
+        mtime_ns = path.stat().st_mtime_ns
+        html = static_assets.rewrite_html(path.read_text(encoding="utf-8"))
+        page = CachedPage.build(html, mtime_ns)
+        self.pages[path] = page
+        return page
+
+    def load_all(self) -> int:
+        self.pages.clear()
+        for path in sorted(self.templates_dir.glob("*.html")):
+            self.load(path)
+        return len(self.pages)
+
+    def get(self, path: Path) -> CachedPage:
+        page = self.pages.get(path)
+        if page is None or (self.reload and path.stat().st_mtime_ns != page.mtime_ns):
+            page = self.load(path)
+        return page
+
+    def split(self, path: Path, pattern: re.Pattern, escape_values: bool = True) -> "SplitTemplate":
+        page = self.get(path)
+        template = page.split_templates.get(pattern.pattern)
+        if template is None:
+            template = SplitTemplate(page.html, pattern, escape_values)
+            page.split_templates[pattern.pattern] = template
+        return template
+
+
+page_cache = PageCache(reload=settings.TEMPLATES_RELOAD)
+
+
+def page_response(path: Path, status_code: int = 200) -> CachedPageResponse:
+    return CachedPageResponse(page_cache.get(path), status_code=status_code)
+
+
+class SplitTemplate:
+    def __init__(self, html: str, pattern: re.Pattern, escape_values: bool = True):
+        self.parts = pattern.split(html)
+        self.escape_values = escape_values
+
+    def render(self, **values: str) -> str:
+        rendered = []
+        for index, part in enumerate(self.parts):
+            if index % 2 == 0:
+                rendered.append(part)
+                continue
+            value = values.get(part.lower(), "")
+            rendered.append(escape(value) if self.escape_values else value)
+        return "".join(rendered)
+
+
+def error_template(path: Path) -> SplitTemplate:
+    return page_cache.split(path, ERROR_PLACEHOLDER_RE)
+
+
+def slot_template(path: Path) -> SplitTemplate:
+    return page_cache.split(path, SSR_SLOT_RE, escape_values=False)
@@ -0,0 +1,78 @@
+import logging
+from contextlib import contextmanager
+
+from src.config import settings
+from src.utils.metrics import RequestTimings, request_timings
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGETS = {
+    ("GET", "/book/catalog"): 15,
+    ("GET", "/book/catalog/view"): 15,
+    ("GET", "/book/{book_id}"): 17,
+    ("GET", "/book/{book_id}/view"): 17,
+    ("GET", "/profile"): 12,
+    ("GET", "/profile/records/{section}"): 4,
+    ("GET", "/admin/meta"): 7,
+    ("GET", "/admin/stats/data"): 4,
+    ("GET", "/admin/requests"): 1,
+    ("GET", "/admin/table/{table_name}"): 5,
+}
+STATEMENT_PREVIEW_LENGTH = 200
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def repeated_statements(timings: RequestTimings, threshold: int) -> list[tuple[str, int]]:
+    return [(shape, count) for shape, count in timings.statements.most_common() if count >= threshold]
+
+
+def describe_statements(timings: RequestTimings, limit: int = 5) -> str:
+    return "\n".join(
+        f"  {count}x {shape[:STATEMENT_PREVIEW_LENGTH]}"
+        for shape, count in timings.statements.most_common(limit)
+    )
+
+
+def check_request_queries(method: str, route: str, timings: RequestTimings) -> None:
+    total = timings.counts["db"]
+    if not total:
+        return
+    threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+    if threshold > 0:
+        for shape, count in repeated_statements(timings, threshold):
+            logger.warning(
+                "Possible N+1 on %s %s: statement repeated %s times (%s queries, %.1f ms total): %s",
+                method, route, count, total, timings.durations["db"] * 1000,
+                shape[:STATEMENT_PREVIEW_LENGTH],
+            )
+    budget = QUERY_BUDGETS.get((method, route))
+    if budget is not None and total > budget:
+        logger.warning(
+            "Query budget exceeded on %s %s: %s queries (budget %s, %.1f ms total)\n%s",
+            method, route, total, budget, timings.durations["db"] * 1000,
+            describe_statements(timings),
+        )
+
+
+@contextmanager
+def count_queries():
+    timings = RequestTimings(parent=request_timings.get())
+    token = request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        request_timings.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    with count_queries() as timings:
+        yield timings
+    total = timings.counts["db"]
+    if total > limit:
+        raise QueryBudgetExceeded(
+            f"Expected at most {limit} queries, got {total}:\n{describe_statements(timings)}"
+        )
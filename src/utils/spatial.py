@@ -0,0 +1,81 @@
+import heapq
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    cos_lat = math.cos(lat_rad)
+    return cos_lat * math.cos(lon_rad), cos_lat * math.sin(lon_rad), math.sin(lat_rad)
+
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    a = to_unit_vector(lat1, lon1)
+    b = to_unit_vector(lat2, lon2)
+    return chord_to_km(math.dist(a, b))
+
+
+class KDTree:
+    def __init__(self, items):
+        self.keys = []
+        self.points = []
+        for key, lat, lon in items:
+            self.keys.append(key)
+            self.points.append(to_unit_vector(lat, lon))
+        self.nodes = []
+        self.root = self.build(list(range(len(self.points))))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def build(self, indices: list[int]) -> int:
+        if not indices:
+            return -1
+        axis = max(
+            range(3),
+            key=lambda dim: max(self.points[i][dim] for i in indices) - min(self.points[i][dim] for i in indices),
+        )
+        indices.sort(key=lambda i: self.points[i][axis])
+        middle = len(indices) // 2
+        node = len(self.nodes)
+        self.nodes.append(None)
+        left = self.build(indices[:middle])
+        right = self.build(indices[middle + 1:])
+        self.nodes[node] = (indices[middle], axis, left, right)
+        return node
+
+    def nearest(self, lat: float, lon: float, k: int) -> list[tuple]:
+        if self.root < 0 or k <= 0:
+            return []
+        target = to_unit_vector(lat, lon)
+        best = []
+        stack = [(self.root, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if len(best) == k and bound >= -best[0][0]:
+                continue
+            index, axis, left, right = self.nodes[node]
+            point = self.points[index]
+            distance = (
+                (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2 + (point[2] - target[2]) ** 2
+            )
+            if len(best) < k:
+                heapq.heappush(best, (-distance, index))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, index))
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            if far >= 0:
+                stack.append((far, max(bound, diff * diff)))
+            if near >= 0:
+                stack.append((near, bound))
+        return [
+            (self.keys[index], chord_to_km(math.sqrt(-distance)))
+            for distance, index in sorted(best, reverse=True)
+        ]
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader
+from starlette.responses import HTMLResponse
+
+from src.config import settings
+from src.utils.cache import render_json
+from src.utils.pages import TEMPLATES_DIR, slot_template
+
+FRAGMENTS_DIR = TEMPLATES_DIR / "fragments"
+SSR_CACHE_CONTROL = "private, no-cache"
+
+
+def book_image_url(image: str | None) -> str:
+    if not image:
+        return "/imgs/default-book.jpg"
+    if image.startswith(("http://", "https://", "/")):
+        return image
+    return f"/imgs/{image}"
+
+
+def srcset(urls: dict | None) -> str:
+    return ", ".join(f"{url} {width}w" for width, url in (urls or {}).items())
+
+
+jinja_env = Environment(
+    loader=FileSystemLoader(FRAGMENTS_DIR),
+    autoescape=True,
+    auto_reload=settings.TEMPLATES_RELOAD,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+jinja_env.filters["book_image_url"] = book_image_url
+jinja_env.filters["srcset"] = srcset
+
+
+class FragmentCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.fragments: OrderedDict[tuple, str] = OrderedDict()
+
+    def book_key(self, template_name: str, book: dict) -> tuple:
+        author = book.get("author") or {}
+        return (
+            template_name,
+            book["id"],
+            book.get("title"),
+            book.get("genre"),
+            author.get("fullname"),
+            book.get("image"),
+            book.get("image_placeholder"),
+            book.get("is_booked_by_user"),
+            book.get("is_owned_by_user"),
+        )
+
+    def render_book(self, template_name: str, book: dict) -> str:
+        key = self.book_key(template_name, book)
+        fragment = self.fragments.get(key)
+        if fragment is not None:
+            self.fragments.move_to_end(key)
+            return fragment
+        fragment = jinja_env.get_template(template_name).render(book=book)
+        self.fragments[key] = fragment
+        if len(self.fragments) > self.max_size:
+            self.fragments.popitem(last=False)
+        return fragment
+
+
+fragment_cache = FragmentCache(settings.SSR_FRAGMENT_CACHE_SIZE)
+
+
+def ssr_data(context) -> str:
+    payload = render_json(context).decode("utf-8").replace("<", "\\u003c")
+    return f'<script id="ssr-data" type="application/json">{payload}</script>'
+
+
+def render_page(path: Path, context, **slots: str) -> HTMLResponse:
+    html = slot_template(path).render(data=ssr_data(context), **slots)
+    return HTMLResponse(content=html, headers={"Cache-Control": SSR_CACHE_CONTROL})
+
+
+def render_book_cards(template_name: str, books: list[dict]) -> str:
+    return "".join(fragment_cache.render_book(template_name, book) for book in books)
+
+
+def render_catalog_page(path: Path, context: dict) -> HTMLResponse:
+    return render_page(path, context, books=render_book_cards("catalog_card.html", context["items"]))
+
+
+def render_index_page(path: Path, context: dict) -> HTMLResponse:
+    return render_page(
+        path,
+        context,
+        books=render_book_cards("index_card.html", context["books"][:3]),
+        organisations=jinja_env.get_template("organisations.html").render(
+            organisations=context["organisations"]
+        ),
+    )
+
+
+def render_book_page(path: Path, context: dict) -> HTMLResponse:
+    return render_page(
+        path,
+        context,
+        book_info=jinja_env.get_template("book_info.html").render(book=context["book"]),
+    )
@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+from src.config import BASE_DIR, settings
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output: str) -> list[dict]:
+    modules = []
+    for line in output.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+    return modules
+
+
+def import_report(module: str, top: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    modules = parse_importtime(result.stderr)
+    packages = defaultdict(float)
+    for entry in modules:
+        packages[entry["module"].split(".")[0]] += entry["self_ms"]
+    target = next(entry for entry in reversed(modules) if entry["module"] == module)
+    return {
+        "module": module,
+        "total_ms": round(target["cumulative_ms"], 1),
+        "modules": len(modules),
+        "packages": {
+            name: round(ms, 1)
+            for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "slowest": [
+            {"module": entry["module"], "self_ms": round(entry["self_ms"], 1),
+             "cumulative_ms": round(entry["cumulative_ms"], 1)}
+            for entry in sorted(modules, key=lambda item: item["self_ms"], reverse=True)[:top]
+        ],
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_request_report(path: str, timeout: float) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BASE_DIR,
+        env=os.environ | {"PYTHONPATH": str(BASE_DIR)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    status = response.status
+                break
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+                break
+            except OSError:
+                time.sleep(0.01)
+        else:
+            raise RuntimeError(f"No response from {url} within {timeout}s")
+        return {"path": path, "status": status, "total_ms": round((time.perf_counter() - started) * 1000, 1)}
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report import time and time-to-first-request and check them against the budgets"
+    )
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--path", default="/auth/login")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3, help="Best of N runs is compared with the budget")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    imports = min((import_report(args.module, args.top) for _ in range(args.runs)), key=lambda r: r["total_ms"])
+    first_request = min(
+        (first_request_report(args.path, args.timeout) for _ in range(args.runs)),
+        key=lambda r: r["total_ms"],
+    )
+    budgets = {
+        "import_ms": settings.STARTUP_IMPORT_BUDGET_MS,
+        "first_request_ms": settings.STARTUP_FIRST_REQUEST_BUDGET_MS,
+    }
+    over_budget = [
+        name for name, measured in (
+            ("import_ms", imports["total_ms"]),
+            ("first_request_ms", first_request["total_ms"]),
+        )
+        if measured > budgets[name]
+    ]
+    report = {"imports": imports, "first_request": first_request, "budgets": budgets, "over_budget": over_budget}
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
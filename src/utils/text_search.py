@@ -0,0 +1,106 @@
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+WORD_RE = re.compile(r"\w+")
+TRIGRAM_SIZE = 3
+
+
+def normalize(text: str | None) -> str:
+    return " ".join(WORD_RE.findall((text or "").lower().replace("ё", "е")))
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+class TextIndex:
+    def __init__(self, documents):
+        self.keys = []
+        self.texts = {}
+        tokens = set()
+        self.grams = defaultdict(set)
+        for key, text in documents:
+            normalized = normalize(text)
+            self.keys.append(key)
+            self.texts[key] = normalized
+            tokens.update((token, key) for token in normalized.split())
+            for gram in trigrams(normalized):
+                self.grams[gram].add(key)
+        self.tokens = sorted(tokens)
+        self.order = {key: position for position, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def prefix(self, word: str) -> set:
+        matched = set()
+        index = bisect_left(self.tokens, (word,))
+        while index < len(self.tokens) and self.tokens[index][0].startswith(word):
+            matched.add(self.tokens[index][1])
+            index += 1
+        return matched
+
+    def substring(self, word: str) -> set:
+        candidates = None
+        for gram in trigrams(word):
+            keys = self.grams.get(gram, set())
+            candidates = keys if candidates is None else candidates & keys
+            if not candidates:
+                return set()
+        return {key for key in candidates if word in self.texts[key]}
+
+    def search(self, query: str | None) -> list:
+        words = normalize(query).split()
+        if not words:
+            return list(self.keys)
+        matched = None
+        for word in words:
+            keys = self.prefix(word)
+            if len(word) >= TRIGRAM_SIZE:
+                keys |= self.substring(word)
+            matched = keys if matched is None else matched & keys
+            if not matched:
+                return []
+        return sorted(matched, key=self.order.__getitem__)
+
+    def suggest(self, query: str | None, limit: int) -> list:
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        return sorted(
+            self.search(normalized),
+            key=lambda key: (not self.texts[key].startswith(normalized), self.order[key]),
+        )[:limit]
+
+
+class PrefixArray:
+    def __init__(self, pairs=()):
+        pairs = sorted(pairs)
+        self.keys = [sys.intern(key) for key, _ in pairs]
+        self.refs = array("q", (ref for _, ref in pairs))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def insert(self, key: str, ref: int) -> None:
+        index = bisect_left(self.keys, key)
+        self.keys.insert(index, sys.intern(key))
+        self.refs.insert(index, ref)
+
+    def remove(self, key: str, ref: int) -> None:
+        index = bisect_left(self.keys, key)
+        while index < len(self.keys) and self.keys[index] == key:
+            if self.refs[index] == ref:
+                del self.keys[index]
+                del self.refs[index]
+                return
+            index += 1
+
+    def scan(self, prefix: str):
+        index = bisect_left(self.keys, prefix)
+        while index < len(self.keys) and self.keys[index].startswith(prefix):
+            yield self.refs[index]
+            index += 1
@@ -0,0 +1,144 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import anyio
+import pytest
+from sqlalchemy import select, text
+
+from src.config import settings
+from src.models.email_outbox import EmailOutboxORM
+from src.services.email import EmailOutboxService, EmailService
+from src.utils.db_manager import DBManager
+
+
+def outgoing(*recipients: str) -> list:
+    return [SimpleNamespace(to_email=to_email, subject="Код", body="1234") for to_email in recipients]
+
+
+def test_send_batch_reuses_connection(smtp_server):
+    mailbox = smtp_server.mailbox
+    sender = EmailService()
+    try:
+        errors = sender.send_batch(outgoing("a@example.com", "b@example.com", "c@example.com"))
+    finally:
+        sender.close()
+    assert errors == [None, None, None]
+    assert mailbox.connections == 1
+    assert [envelope.rcpt_tos for envelope in mailbox.messages] == [
+        ["a@example.com"], ["b@example.com"], ["c@example.com"]
+    ]
+
+
+def test_send_batch_reports_errors_per_message(smtp_server):
+    mailbox = smtp_server.mailbox
+    sender = EmailService()
+    try:
+        errors = sender.send_batch(outgoing("a@example.com", "reject@example.com", "b@example.com"))
+    finally:
+        sender.close()
+    assert errors[0] is None and errors[2] is None
+    assert "550" in errors[1]
+    assert len(mailbox.messages) == 2
+
+
+def test_send_batch_reconnects_after_server_restart(smtp_server):
+    mailbox = smtp_server.mailbox
+    sender = EmailService()
+    try:
+        assert sender.send_batch(outgoing("a@example.com")) == [None]
+        smtp_server.stop()
+        smtp_server.start()
+        assert sender.send_batch(outgoing("b@example.com")) == [None]
+    finally:
+        sender.close()
+    assert mailbox.connections == 2
+    assert len(mailbox.messages) == 2
+
+
+def test_send_batch_fails_without_server(monkeypatch, free_port):
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", free_port)
+    monkeypatch.setattr(settings, "SMTP_SSL", False)
+    monkeypatch.setattr(settings, "SMTP_FROM", "noreply@example.com")
+    errors = EmailService().send_batch(outgoing("a@example.com", "b@example.com"))
+    assert all(errors)
+
+
+async def enqueue(database, service: EmailOutboxService, *recipients: str) -> None:
+    async with DBManager(session_factory=database) as db:
+        for to_email in recipients:
+            await service.enqueue(db, to_email, "Код", "1234")
+        await db.commit()
+
+
+async def outbox_rows(database) -> list[EmailOutboxORM]:
+    async with database() as session:
+        result = await session.execute(select(EmailOutboxORM).order_by(EmailOutboxORM.id))
+        return list(result.scalars().all())
+
+
+@pytest.mark.anyio
+async def test_deliver_pending_marks_sent(database, smtp_server):
+    mailbox = smtp_server.mailbox
+    service = EmailOutboxService(session_factory=database)
+    await enqueue(database, service, "a@example.com", "b@example.com")
+
+    assert await service.deliver_pending() == 2
+    assert await service.deliver_pending() == 0
+
+    rows = await outbox_rows(database)
+    assert [(row.status, row.attempts) for row in rows] == [("SENT", 1), ("SENT", 1)]
+    assert all(row.sent_at is not None for row in rows)
+    assert len(mailbox.messages) == 2
+    service.sender.close()
+
+
+@pytest.mark.anyio
+async def test_deliver_pending_retries_with_backoff(database, smtp_server, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 2)
+    service = EmailOutboxService(session_factory=database)
+    await enqueue(database, service, "reject@example.com")
+
+    started = datetime.now(timezone.utc)
+    assert await service.deliver_pending() == 1
+    [row] = await outbox_rows(database)
+    assert (row.status, row.attempts) == ("PENDING", 1)
+    assert "550" in row.last_error
+    assert row.next_attempt_at >= started + timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS)
+    assert await service.deliver_pending() == 0
+
+    async with database() as session:
+        await session.execute(text("UPDATE email_outbox SET next_attempt_at = now()"))
+        await session.commit()
+    assert await service.deliver_pending() == 1
+    [row] = await outbox_rows(database)
+    assert (row.status, row.attempts) == ("FAILED", 2)
+    service.sender.close()
+
+
+@pytest.mark.anyio
+async def test_deliver_pending_does_not_hold_locks_while_sending(database, smtp_server):
+    mailbox = smtp_server.mailbox
+    mailbox.receiving = threading.Event()
+    mailbox.release = threading.Event()
+    service = EmailOutboxService(session_factory=database)
+    other = EmailOutboxService(session_factory=database)
+    await enqueue(database, service, "a@example.com")
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(service.deliver_pending)
+        assert await anyio.to_thread.run_sync(mailbox.receiving.wait, 10)
+        try:
+            async with database() as session:
+                locked = await session.execute(
+                    text("SELECT status FROM email_outbox FOR UPDATE NOWAIT")
+                )
+                assert locked.scalars().all() == ["SENDING"]
+            assert await other.claim() == []
+        finally:
+            mailbox.release.set()
+
+    [row] = await outbox_rows(database)
+    assert row.status == "SENT"
+    service.sender.close()
@@ -0,0 +1,49 @@
+import io
+
+import pytest
+
+from src.config import settings
+from src.services.images import ImageStorageService, sniff_suffix
+from src.services.user import AuthService
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 64
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def test_store_deduplicates_by_content(tmp_path):
+    storage = ImageStorageService(tmp_path)
+    first = storage._store(io.BytesIO(JPEG), ".jpeg")
+    second = storage._store(io.BytesIO(JPEG), ".jpg")
+    assert first == second
+    assert first.endswith(".jpg")
+    assert list((tmp_path / ".tmp").iterdir()) == []
+
+
+def test_store_uses_the_sniffed_format(tmp_path):
+    assert ImageStorageService(tmp_path)._store(io.BytesIO(PNG), ".jpg").endswith(".png")
+    assert sniff_suffix(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == ".webp"
+    assert sniff_suffix(b"plain text") is None
+
+
+@pytest.mark.anyio
+async def test_oversized_upload_is_rejected_before_parsing(client, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_MAX_UPLOAD_BYTES", 1024)
+    client.cookies.set("access_token", AuthService().create_access_token({"user_id": 1, "role": "ADMIN"}))
+
+    async def body():
+        raise AssertionError("the body must not be read")
+        yield b""
+
+    response = await client.post(
+        "/admin/table/book/1/image",
+        content=body(),
+        headers={"Content-Type": "multipart/form-data; boundary=x", "Content-Length": str(10 ** 9)},
+    )
+    assert response.status_code == 413
+
+    response = await client.post(
+        "/admin/requests/1/approve",
+        content=body(),
+        headers={"Content-Type": "multipart/form-data; boundary=x"},
+    )
+    assert response.status_code == 411
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src.models.author import AuthorORM
+from src.models.book import BookORM
+from src.models.exchange_point import ExchangePointORM
+from src.models.instance import InstanceORM
+from src.models.organisation import OrganisationORM
+from src.models.user import UserORM
+from src.utils.spatial import haversine_km
+
+POINTS = [(55.75, 37.61), (55.80, 37.70), (59.93, 30.33), (None, None)]
+
+
+@pytest.mark.anyio
+async def test_nearest_ranks_only_shelves_with_free_copies(client, database):
+    async with database() as session:
+        organisation = OrganisationORM(name="Библиотека")
+        owner = UserORM(name="Владелец", lastname="Книг", email="owner@example.com",
+                        hashed_password="-", role="USER")
+        author = AuthorORM(fullname="Автор")
+        session.add_all([organisation, owner, author])
+        await session.flush()
+        points = [
+            ExchangePointORM(organisation_id=organisation.id, address=f"Улица {index}",
+                             latitude=lat, longitude=lon)
+            for index, (lat, lon) in enumerate(POINTS)
+        ]
+        book = BookORM(author_id=author.id, title="Книга")
+        session.add_all([*points, book])
+        await session.flush()
+        now = datetime.now(timezone.utc)
+        session.add_all([
+            InstanceORM(book_id=book.id, owner_id=owner.id, exchange_point_id=point.id,
+                        status=status, created_at=now)
+            for point, status in zip(points, ("BOOKED", "FREE", "FREE", "FREE"))
+        ])
+        await session.commit()
+        point_ids = [point.id for point in points]
+        book_id = book.id
+
+    response = await client.get(f"/book/{book_id}/nearest", params={"lat": 55.75, "lon": 37.61})
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["exchange_point"]["id"] for item in items] == [point_ids[1], point_ids[2]]
+    assert items[0]["distance_km"] == round(haversine_km(55.75, 37.61, *POINTS[1]), 3)
+    assert all(len(item["instance_ids"]) == 1 for item in items)
+
+    response = await client.get(f"/book/{book_id}/nearest", params={"lat": 59.9, "lon": 30.3, "limit": 1})
+    assert [item["exchange_point"]["id"] for item in response.json()["items"]] == [point_ids[2]]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("latitude,longitude", [(55.75, None), (None, 37.61), (120.0, 37.61)])
+async def test_exchange_point_rejects_invalid_coordinates(database, latitude, longitude):
+    async with database() as session:
+        organisation = OrganisationORM(name="Библиотека")
+        session.add(organisation)
+        await session.flush()
+        session.add(ExchangePointORM(organisation_id=organisation.id, address="Улица",
+                                     latitude=latitude, longitude=longitude))
+        with pytest.raises(IntegrityError):
+            await session.flush()
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.api.admin import MODEL_MAP
+from src.config import settings
+from src.models.author import AuthorORM
+from src.models.book import BookORM
+from src.models.booking import BookingORM
+from src.models.exchange_point import ExchangePointORM
+from src.models.instance import InstanceORM
+from src.models.new_added_instance import NewAddedInstanceORM
+from src.models.organisation import OrganisationORM
+from src.models.user import UserORM
+from src.services.user import AuthService
+from src.utils.metrics import statement_shape
+from src.utils.query_budget import QUERY_BUDGETS, assert_max_queries
+
+BOOKS = 8
+
+
+@pytest.mark.parametrize(
+    "statement, shape",
+    [
+        ("SELECT id FROM book WHERE id IN ($1, $2)", "SELECT id FROM book WHERE id IN (?)"),
+        ("SELECT id FROM book WHERE id IN ($1::INTEGER, $2::INTEGER, $3::INTEGER)",
+         "SELECT id FROM book WHERE id IN (?)"),
+        ("SELECT id FROM book\n LIMIT $1::INTEGER OFFSET $2::INTEGER", "SELECT id FROM book LIMIT ? OFFSET ?"),
+        ("UPDATE booking SET expires_at=$1::TIMESTAMP WITH TIME ZONE WHERE booking.id = $2::INTEGER",
+         "UPDATE booking SET expires_at=? WHERE booking.id = ?"),
+        ("SELECT $1::NUMERIC(10, 2), $2::INTEGER[]", "SELECT ?"),
+    ],
+)
+def test_statement_shape_folds_placeholders(statement, shape):
+    assert statement_shape(statement) == shape
+
+
+@pytest.fixture
+async def seeded(database):
+    now = datetime.now(timezone.utc)
+    async with database() as session:
+        organisation = OrganisationORM(name="Библиотека", description="Городская")
+        admin = UserORM(name="Админ", lastname="Админов", email="admin@example.com",
+                        hashed_password="-", role="ADMIN", email_verified=True)
+        reader = UserORM(name="Читатель", lastname="Читателев", email="reader@example.com",
+                         hashed_password="-", role="USER", email_verified=True)
+        authors = [AuthorORM(fullname=f"Автор {index}", country="Россия") for index in range(2)]
+        session.add_all([organisation, admin, reader, *authors])
+        await session.flush()
+        points = [
+            ExchangePointORM(organisation_id=organisation.id, address=f"Улица {index}",
+                             latitude=55.75 + index / 100, longitude=37.61 + index / 100)
+            for index in range(3)
+        ]
+        books = [
+            BookORM(author_id=authors[index % 2].id, title=f"Книга {index}", genre="Роман", year=2000 + index)
+            for index in range(BOOKS)
+        ]
+        session.add_all([*points, *books])
+        await session.flush()
+        instances = [
+            InstanceORM(book_id=book.id, owner_id=admin.id, exchange_point_id=points[index % 3].id,
+                        status="FREE", created_at=now - timedelta(minutes=index))
+            for index, book in enumerate(books)
+            for _ in range(2)
+        ]
+        booked = InstanceORM(book_id=books[0].id, owner_id=admin.id, user_id=reader.id,
+                             exchange_point_id=points[0].id, status="BOOKED", created_at=now)
+        owned = InstanceORM(book_id=books[1].id, owner_id=reader.id, user_id=reader.id,
+                            exchange_point_id=points[1].id, status="OWNED", created_at=now)
+        session.add_all([*instances, booked, owned])
+        await session.flush()
+        session.add_all([
+            BookingORM(user_id=reader.id, instance_id=booked.id, book_id=books[0].id,
+                       expires_at=now + timedelta(days=1)),
+            *(
+                NewAddedInstanceORM(owner_id=reader.id, title=f"Заявка {index}", author="Автор",
+                                    address="Улица 0", created_at=now)
+                for index in range(3)
+            ),
+        ])
+        await session.commit()
+        return {
+            "book_id": books[0].id,
+            "admin": AuthService().create_access_token({"user_id": admin.id, "role": admin.role}),
+            "reader": AuthService().create_access_token({"user_id": reader.id, "role": reader.role}),
+        }
+
+
+def budget_cases(seeded):
+    book_id = seeded["book_id"]
+    return [
+        ("/book/catalog", "/book/catalog", None),
+        ("/book/catalog", "/book/catalog", "reader"),
+        ("/book/catalog/view", "/book/catalog/view", None),
+        ("/book/catalog/view", "/book/catalog/view", "reader"),
+        ("/book/{book_id}", f"/book/{book_id}", None),
+        ("/book/{book_id}", f"/book/{book_id}", "reader"),
+        ("/book/{book_id}/view", f"/book/{book_id}/view", None),
+        ("/book/{book_id}/view", f"/book/{book_id}/view", "reader"),
+        ("/profile", "/profile", "reader"),
+        ("/profile/records/{section}", "/profile/records/own", "reader"),
+        ("/profile/records/{section}", "/profile/records/rent", "reader"),
+        ("/profile/records/{section}", "/profile/records/booking", "reader"),
+        ("/admin/meta", "/admin/meta", "admin"),
+        ("/admin/stats/data", "/admin/stats/data", "admin"),
+        ("/admin/requests", "/admin/requests", "admin"),
+        *(("/admin/table/{table_name}", f"/admin/table/{table_name}", "admin") for table_name in MODEL_MAP),
+    ]
+
+
+@pytest.mark.anyio
+async def test_budgeted_routes_stay_within_budget(client, seeded, fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "SSR_ENABLED", True)
+    cases = budget_cases(seeded)
+    assert {("GET", route) for route, _, _ in cases} == set(QUERY_BUDGETS)
+    for route, url, token in cases:
+        await fake_redis.redis.flushall()
+        client.cookies.clear()
+        if token:
+            client.cookies.set("access_token", seeded[token])
+        with assert_max_queries(QUERY_BUDGETS[("GET", route)]):
+            response = await client.get(url)
+        assert response.status_code == 200, url
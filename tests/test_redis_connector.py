@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.mark.anyio
+async def test_health_reports_pool_checkouts(fake_redis):
+    health = await fake_redis.health()
+    assert health["ok"]
+    assert health["pool"]["created"] == 1
+    assert health["pool"]["in_use"] == 0
+    assert health["pool"]["available"] == 1
+
+    connection = await fake_redis.pool.get_connection()
+    try:
+        assert fake_redis.pool_stats()["in_use"] == 1
+        await fake_redis.redis.ping()
+        assert fake_redis.pool_stats() | {"max_connections": None} == {
+            "max_connections": None,
+            "created": 2,
+            "in_use": 1,
+            "available": 1,
+        }
+    finally:
+        await fake_redis.pool.release(connection)
+    assert fake_redis.pool_stats()["in_use"] == 0
@@ -0,0 +1,35 @@
+import pytest
+
+from src.models.exchange_point import ExchangePointORM
+from src.models.organisation import OrganisationORM
+
+
+@pytest.mark.anyio
+async def test_shelves_are_paginated_and_filtered(client, database):
+    async with database() as session:
+        organisation = OrganisationORM(name="Библиотека")
+        session.add(organisation)
+        await session.flush()
+        session.add_all([
+            ExchangePointORM(organisation_id=organisation.id, address=f"ул. Ленина, {index:02d}")
+            for index in range(1, 24)
+        ])
+        session.add(ExchangePointORM(organisation_id=organisation.id, address="пр. Мира, 1"))
+        await session.commit()
+
+    response = await client.get("/main/shelves")
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["page"], data["per_page"], data["total"], data["total_pages"]) == (1, 10, 24, 3)
+    assert [item["address"] for item in data["items"]][:2] == ["пр. Мира, 1", "ул. Ленина, 01"]
+
+    data = (await client.get("/main/shelves", params={"q": "ул. ленина", "page": 3})).json()
+    assert (data["page"], data["total"], data["total_pages"]) == (3, 23, 3)
+    assert [item["address"] for item in data["items"]] == ["ул. Ленина, 21", "ул. Ленина, 22", "ул. Ленина, 23"]
+
+    data = (await client.get("/main/shelves", params={"q": "мира", "page": 0})).json()
+    assert (data["page"], data["total"]) == (1, 1)
+    assert data["items"][0]["address"] == "пр. Мира, 1"
+
+    data = (await client.get("/main/shelves", params={"q": "ленина", "page": 5})).json()
+    assert data["items"] == [] and data["total_pages"] == 3
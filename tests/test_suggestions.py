@@ -0,0 +1,92 @@
+import pytest
+
+from src.services.suggestions import BookSuggestIndex, from_ref, to_ref
+from src.utils.text_search import PrefixArray
+
+
+def make_index(rows: dict[int, str]) -> BookSuggestIndex:
+    index = BookSuggestIndex(check_interval=60, changes_limit=100, scan_limit=100)
+    for ref, text in rows.items():
+        index.put(ref, text)
+    return index
+
+
+def texts(items: list[dict]) -> list[str]:
+    return [item["text"] for item in items]
+
+
+def test_prefix_array_scan_insert_remove():
+    keys = PrefixArray([("мир", 3), ("война", 1), ("волга", 2)])
+    assert list(keys.scan("во")) == [1, 2]
+    assert list(keys.scan("м")) == [3]
+    assert list(keys.scan("я")) == []
+
+    keys.insert("вода", 4)
+    keys.insert("война", 5)
+    assert list(keys.scan("вод")) == [4]
+    assert sorted(keys.scan("вой")) == [1, 5]
+
+    keys.remove("война", 5)
+    keys.remove("война", 99)
+    assert list(keys.scan("вой")) == [1]
+    assert len(keys) == 4
+
+
+@pytest.mark.parametrize("kind,row_id", [("book", 1), ("author", 1), ("book", 2 ** 40), ("author", 0)])
+def test_ref_round_trip(kind, row_id):
+    assert from_ref(to_ref(kind, row_id)) == (kind, row_id)
+
+
+def test_refs_of_different_kinds_do_not_collide():
+    assert to_ref("book", 7) != to_ref("author", 7)
+
+
+def test_suggest_folds_yo():
+    index = make_index({to_ref("book", 1): "Ёлка", to_ref("book", 2): "Зелёный шум"})
+    assert texts(index.suggest("ел", 10)) == ["Ёлка"]
+    assert texts(index.suggest("зеле", 10)) == ["Зелёный шум"]
+
+
+def test_suggest_prefers_title_start_and_matches_mid_title_words():
+    index = make_index({
+        to_ref("book", 1): "Война и мир",
+        to_ref("book", 2): "Мир Полудня",
+        to_ref("author", 3): "Мирон Петровский",
+    })
+    assert texts(index.suggest("мир", 10)) == ["Мир Полудня", "Мирон Петровский", "Война и мир"]
+    assert texts(index.suggest("и мир", 10)) == ["Война и мир"]
+    assert texts(index.suggest("мир пол", 10)) == ["Мир Полудня"]
+    assert index.suggest("мир война", 10) == []
+
+
+def test_suggest_dedupes_same_text_per_kind():
+    index = make_index({
+        to_ref("book", 1): "Идиот",
+        to_ref("book", 2): "Идиот!",
+        to_ref("author", 3): "Идиот",
+    })
+    items = index.suggest("идиот", 10)
+    assert sorted(item["type"] for item in items) == ["author", "book"]
+    assert len(index.suggest("идиот", 1)) == 1
+
+
+def test_put_and_discard_update_index_incrementally():
+    ref = to_ref("book", 1)
+    index = make_index({ref: "Белые ночи"})
+    assert texts(index.suggest("ноч", 10)) == ["Белые ночи"]
+
+    index.put(ref, "Бедные люди")
+    assert index.suggest("ноч", 10) == []
+    assert texts(index.suggest("люд", 10)) == ["Бедные люди"]
+    assert len(index) == 1
+
+    index.discard(ref)
+    index.discard(ref)
+    assert index.suggest("бед", 10) == []
+    assert len(index) == 0
+    assert len(index.heads) == 0 and len(index.words) == 0
+
+
+def test_put_ignores_text_without_words():
+    index = make_index({to_ref("book", 1): "?!"})
+    assert len(index) == 0
@@ -0,0 +1,63 @@
+from src.utils.text_search import TextIndex, normalize
+
+DOCUMENTS = [
+    (1, "Библиотека ул. Ленина, 5"),
+    (2, "Кафе «Пушкин» Тверской бульвар"),
+    (3, "Книжный клуб, проспект Мира"),
+    (4, "Ёлочка, ул. Садовая"),
+]
+
+
+def make_index() -> TextIndex:
+    return TextIndex(DOCUMENTS)
+
+
+def test_normalize_strips_punctuation_and_folds_yo():
+    assert normalize("  Ул.Ленина,  5 ") == "ул ленина 5"
+    assert normalize("«Ёлка»") == "елка"
+    assert normalize(None) == ""
+
+
+def test_empty_query_returns_everything_in_order():
+    index = make_index()
+    assert index.search(None) == [1, 2, 3, 4]
+    assert index.search(" ,. ") == [1, 2, 3, 4]
+    assert len(index) == 4
+
+
+def test_short_words_match_prefixes_only():
+    index = make_index()
+    assert index.search("ле") == [1]
+    assert index.search("ни") == []
+    assert index.search("к") == [2, 3]
+
+
+def test_longer_words_match_substrings():
+    index = make_index()
+    assert index.search("нин") == [1]
+    assert index.search("ушки") == [2]
+    assert index.search("верск") == [2]
+    assert index.search("ленинград") == []
+
+
+def test_multiple_words_are_combined_with_and():
+    index = make_index()
+    assert index.search("ул") == [1, 4]
+    assert index.search("ул садов") == [4]
+    assert index.search("кафе ленина") == []
+
+
+def test_punctuation_in_query_is_ignored():
+    index = make_index()
+    assert index.search("ул. Ленина") == [1]
+    assert index.search("ул.Ленина") == [1]
+    assert index.search("«Пушкин»") == [2]
+    assert index.search("елочка") == [4]
+
+
+def test_suggest_ranks_leading_matches_first():
+    index = make_index()
+    assert index.suggest("к", 10) == [2, 3]
+    assert index.suggest("клуб", 10) == [3]
+    assert index.suggest("ул", 1) == [1]
+    assert index.suggest("", 10) == []